@@ -6,7 +6,7 @@ from pydantic import BaseModel
 from db import User
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
-from passlib.context import CryptContext
+from hashing import hash_password, verify_password
 import logging
 
 # Set up logging
@@ -18,7 +18,6 @@ SECRET_KEY = "your-secret-key-keep-it-secret"  # In production, use environment
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 router = APIRouter()
@@ -31,12 +30,6 @@ class UserCreate(BaseModel):
     username: str
     password: str
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password):
-    return pwd_context.hash(password)
-
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -72,12 +65,14 @@ async def signup(user: UserCreate):
             raise HTTPException(status_code=400, detail="Username already exists")
         
         # Create new user
-        hashed_password = get_password_hash(user.password)
+        hashed_password = await hash_password(user.password)
         new_user = User(username=user.username, hashed_password=hashed_password)
         await new_user.insert()
         logger.info(f"User {user.username} registered successfully")
         
         return {"message": "User registered successfully"}
+    except HTTPException as he:
+        raise he
     except Exception as e:
         logger.error(f"Error during signup: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -87,13 +82,23 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     try:
         # Find user
         user = await User.find_one({"username": form_data.username})
-        if not user or not verify_password(form_data.password, user.hashed_password):
+        valid, new_hash = False, None
+        if user:
+            valid, new_hash = await verify_password(form_data.password, user.hashed_password)
+        if not valid:
             raise HTTPException(
                 status_code=401,
                 detail="Incorrect username or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
+        # Store a stronger hash if the cost factor was raised since the password was set
+        if new_hash:
+            try:
+                await user.update_password(new_hash)
+            except Exception as e:
+                logger.warning(f"Could not upgrade password hash for {user.username}: {str(e)}")
+
         # Create access token
         access_token = create_access_token(data={"sub": user.username})
         logger.info(f"User {form_data.username} logged in successfully")
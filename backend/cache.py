@@ -0,0 +1,139 @@
+# backend/cache.py
+
+import json
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Lookup states returned by TTLCache.get
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+class TTLCache:
+    """LRU cache bounded by entry count and approximate memory, with per-entry TTL.
+
+    Entries are fresh until their TTL runs out and then stale for a further
+    ``stale_ttl`` seconds, during which they can still be served while the
+    caller refreshes them in the background.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float, stale_ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        # key -> (value, size, fresh_until, stale_until)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, float, float]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Tuple[Optional[Any], str]:
+        """Look up a key and return (value, state)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None, MISS
+
+        value, _, fresh_until, stale_until = entry
+        now = time.monotonic()
+        if now >= stale_until:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None, MISS
+
+        self._entries.move_to_end(key)
+        if now < fresh_until:
+            self.hits += 1
+            return value, FRESH
+        self.stale_hits += 1
+        return value, STALE
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value, evicting least recently used entries if needed"""
+        size = self._estimate_size(value)
+        if size > self.max_bytes:
+            logger.debug(f"Not caching {key}: {size} bytes exceeds cache budget")
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        now = time.monotonic()
+        fresh_until = now + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (value, size, fresh_until, fresh_until + self.stale_ttl)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Value of an unexpired key without counting a lookup or refreshing its LRU position"""
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() >= entry[3]:
+            return None
+        return entry[0]
+
+    def expires_in(self, key: Hashable) -> Optional[float]:
+        """Seconds until a key stops being fresh (negative once stale), None if absent"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        _, _, fresh_until, stale_until = entry
+        now = time.monotonic()
+        if now >= stale_until:
+            return None
+        return fresh_until - now
+
+    def invalidate(self, key: Hashable):
+        """Drop a key if present"""
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self):
+        """Drop all entries"""
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict:
+        """Get cache counters"""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: Hashable):
+        _, size, _, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    @staticmethod
+    def _estimate_size(value: Any) -> int:
+        """Approximate memory footprint from the serialized size"""
+        try:
+            return len(json.dumps(value, default=str))
+        except (TypeError, ValueError):
+            return 0
@@ -1,6 +1,10 @@
 from fastapi import APIRouter, HTTPException
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
+from pymongo import DeleteOne, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from db import get_database
+from responses import FastJSONResponse
+from cart_cache import CART_CACHE_MAX_ITEMS, cart_cache
 import logging
 from datetime import datetime
 
@@ -11,6 +15,58 @@ logger = logging.getLogger(__name__)
 # Create router
 router = APIRouter(tags=["cart"])
 
+# Cart page settings
+CART_PAGE_LIMIT = 100                # Items per /get_cart page when the request sets no limit
+CART_MAX_PAGE_LIMIT = 500
+
+# Bulk mutation settings
+CART_BULK_MAX_OPERATIONS = 500       # Operations accepted in one /bulk_cart request
+DUPLICATE_KEY_ERROR = 11000
+
+# Item fields a cart entry is built from, with their types
+ITEM_FIELDS = {"product": str, "price": float, "platform": str, "delivery": int, "url": str}
+
+def build_cart_item(username: str, item: Dict, added_at: datetime) -> Dict:
+    """Validate an item and build its cart document"""
+    for field in ITEM_FIELDS:
+        if field not in item:
+            raise ValueError(f"Missing required field: {field}")
+    return {
+        "username": username,
+        "item": {field: cast(item[field]) for field, cast in ITEM_FIELDS.items()},
+        "added_at": added_at
+    }
+
+def build_item_update(item: Dict) -> Dict:
+    """Validate the fields of an item update and build its $set document"""
+    if "product" not in item:
+        raise ValueError("Missing required field: product")
+    changes = {
+        f"item.{field}": cast(item[field])
+        for field, cast in ITEM_FIELDS.items()
+        if field != "product" and field in item
+    }
+    if not changes:
+        raise ValueError(f"Nothing to update, set any of: {', '.join(field for field in ITEM_FIELDS if field != 'product')}")
+    return changes
+
+# Write-through updates applied to a cached cart after a successful write
+def unchanged() -> Callable[[List[Dict]], List[Dict]]:
+    return lambda items: items
+
+def appended(item: Dict) -> Callable[[List[Dict]], List[Dict]]:
+    return lambda items: items + [item]
+
+def updated(product: str, changes: Dict) -> Callable[[List[Dict]], List[Dict]]:
+    fields = {key.split(".", 1)[1]: value for key, value in changes.items()}
+    return lambda items: [{**entry, **fields} if entry["product"] == product else entry for entry in items]
+
+def removed(product: str) -> Callable[[List[Dict]], List[Dict]]:
+    return lambda items: [entry for entry in items if entry["product"] != product]
+
+def cleared() -> Callable[[List[Dict]], List[Dict]]:
+    return lambda items: []
+
 @router.post("/add_to_cart")
 async def add_to_cart(item: Dict):
     """Add item to user's cart"""
@@ -19,42 +75,28 @@ async def add_to_cart(item: Dict):
         logger.debug(f"Raw request data: {item}")
 
         # Validate required fields
-        required_fields = ['username', 'product', 'price', 'platform', 'delivery', 'url']
-        for field in required_fields:
-            if field not in item:
-                raise HTTPException(status_code=400, detail=f"Missing required field: {field}")
+        try:
+            if "username" not in item:
+                raise ValueError("Missing required field: username")
+            cart_item = build_cart_item(item["username"], item, datetime.utcnow())
+        except (TypeError, ValueError) as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-        # Get database instance
-        db = await get_database()
-        cart_collection = db.cart
-
-        # Check if item already exists in cart
-        existing_item = await cart_collection.find_one({
-            "username": item["username"],
-            "item.product": item["product"]
-        })
+        logger.debug(f"Created cart item: {cart_item}")
 
-        if existing_item:
+        # One atomic insert; the unique (username, item.product) index rejects duplicates
+        db = await get_database()
+        version = cart_cache.begin_write(item["username"])
+        mutate = None
+        try:
+            result = await db.cart.insert_one(cart_item)
+            mutate = appended(cart_item["item"])
+        except DuplicateKeyError:
+            mutate = unchanged()
             logger.debug("[DEBUG] Item already exists in cart")
             raise HTTPException(status_code=400, detail="Item already exists in cart")
-
-        # Create cart item
-        cart_item = {
-            "username": item["username"],
-            "item": {
-                "product": item["product"],
-                "price": float(item["price"]),
-                "platform": item["platform"],
-                "delivery": int(item["delivery"]),
-                "url": item["url"]  # Store the product URL
-            },
-            "added_at": datetime.utcnow()
-        }
-
-        logger.debug(f"Created cart item: {cart_item}")
-
-        # Insert into database
-        result = await cart_collection.insert_one(cart_item)
+        finally:
+            cart_cache.end_write(item["username"], version, mutate)
         logger.debug("[DEBUG] Successfully inserted item into database")
 
         return {
@@ -69,30 +111,143 @@ async def add_to_cart(item: Dict):
         logger.error(f"Error adding item to cart: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+EMPTY_TOTALS = {"items": 0, "price": 0.0, "max_delivery": None}
+
+def cart_summary(items: List[Dict]) -> Tuple[Dict, List[Dict]]:
+    """Totals and per-platform groups of a cached cart, shaped like the aggregation's"""
+    platforms: Dict[str, Dict] = {}
+    for item in items:
+        group = platforms.setdefault(item["platform"], {"_id": item["platform"], "items": 0, "price": 0.0})
+        group["items"] += 1
+        group["price"] += item["price"]
+    if not items:
+        return EMPTY_TOTALS, []
+    totals = {
+        "items": len(items),
+        "price": sum(item["price"] for item in items),
+        "max_delivery": max(item["delivery"] for item in items),
+    }
+    return totals, sorted(platforms.values(), key=lambda group: group["_id"])
+
+def render_cart(items: List[Dict], totals: Dict, platforms: List[Dict], offset: int, limit: int) -> Dict:
+    """Build the /get_cart response for one page of items"""
+    return {
+        "items": items,
+        "total_items": totals["items"],
+        "total_price": round(totals["price"], 2),
+        "max_delivery": totals["max_delivery"],
+        "platforms": {
+            platform["_id"]: {"items": platform["items"], "total_price": round(platform["price"], 2)}
+            for platform in platforms
+        },
+        "offset": offset,
+        "limit": limit
+    }
+
 @router.get("/get_cart")
-async def get_cart(username: str):
-    """Get user's cart items"""
+async def get_cart(username: str, offset: int = 0, limit: int = CART_PAGE_LIMIT):
+    """Get one page of the user's cart items with totals for the whole cart"""
     try:
+        if offset < 0 or not 1 <= limit <= CART_MAX_PAGE_LIMIT:
+            raise HTTPException(status_code=400, detail=f"Expected offset >= 0 and 1 <= limit <= {CART_MAX_PAGE_LIMIT}")
         logger.debug(f"Fetching cart for user: {username}")
-        
+
+        # Active users' carts are served from memory
+        items = cart_cache.get(username)
+        if items is not None:
+            totals, platforms = cart_summary(items)
+            return FastJSONResponse(render_cart(items[offset:offset + limit], totals, platforms, offset, limit))
+
+        version = cart_cache.version(username)
+
         # Get database instance
         db = await get_database()
-        cart_collection = db.cart
 
-        # Get all items in user's cart
-        cursor = cart_collection.find({"username": username})
-        cart_items = []
-        async for doc in cursor:
-            logger.debug(f"Cart item found: {doc['item']}")
-            cart_items.append(doc['item'])
+        # Pages near the start read the whole of a small cart so it can be cached
+        cacheable = offset + limit <= CART_CACHE_MAX_ITEMS + 1
+        skip, take = (0, CART_CACHE_MAX_ITEMS + 1) if cacheable else (offset, limit)
+
+        # Items and cart totals in one round-trip
+        pipeline = [
+            {"$match": {"username": username}},
+            {"$project": {"_id": 1, "item": 1, "added_at": 1}},
+            {"$facet": {
+                "items": [
+                    {"$sort": {"added_at": 1, "_id": 1}},
+                    {"$skip": skip},
+                    {"$limit": take},
+                    {"$replaceRoot": {"newRoot": "$item"}},
+                ],
+                "totals": [
+                    {"$group": {
+                        "_id": None,
+                        "items": {"$sum": 1},
+                        "price": {"$sum": "$item.price"},
+                        "max_delivery": {"$max": "$item.delivery"},
+                    }},
+                ],
+                "platforms": [
+                    {"$group": {"_id": "$item.platform", "items": {"$sum": 1}, "price": {"$sum": "$item.price"}}},
+                    {"$sort": {"_id": 1}},
+                ],
+            }},
+        ]
+        # $facet returns a single document
+        result = (await db.cart.aggregate(pipeline).to_list(length=1))[0]
+        totals = result["totals"][0] if result["totals"] else EMPTY_TOTALS
+        items = result["items"]
 
-        logger.debug(f"Returning {len(cart_items)} items")
-        return cart_items
+        if cacheable:
+            if totals["items"] <= CART_CACHE_MAX_ITEMS:
+                cart_cache.fill(username, items, version)
+            items = items[offset:offset + limit]
 
+        logger.debug(f"Returning {len(items)} of {totals['items']} items")
+        return FastJSONResponse(render_cart(items, totals, result["platforms"], offset, limit))
+
+    except HTTPException as he:
+        raise he
     except Exception as e:
         logger.error(f"Error getting cart: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.put("/update_cart_item")
+async def update_cart_item(item: Dict):
+    """Update the price, platform, delivery or URL of an item in the user's cart"""
+    try:
+        try:
+            if "username" not in item:
+                raise ValueError("Missing required field: username")
+            changes = build_item_update(item)
+        except (TypeError, ValueError) as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        # Get database instance
+        db = await get_database()
+
+        # Update in place with one atomic operation
+        version = cart_cache.begin_write(item["username"])
+        mutate = None
+        try:
+            result = await db.cart.update_one(
+                {"username": item["username"], "item.product": item["product"]},
+                {"$set": changes}
+            )
+            mutate = updated(item["product"], changes)
+        finally:
+            cart_cache.end_write(item["username"], version, mutate)
+
+        if result.matched_count == 0:
+            raise HTTPException(status_code=404, detail="Item not found in cart")
+
+        return {"message": "Item updated", "modified": result.modified_count}
+
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Error updating cart item: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.delete("/remove_from_cart")
 async def remove_from_cart(username: str, product: str):
     """Remove item from user's cart"""
@@ -105,10 +260,16 @@ async def remove_from_cart(username: str, product: str):
         cart_collection = db.cart
 
         # Remove item from cart
-        result = await cart_collection.delete_one({
-            "username": username,
-            "item.product": product
-        })
+        version = cart_cache.begin_write(username)
+        mutate = None
+        try:
+            result = await cart_collection.delete_one({
+                "username": username,
+                "item.product": product
+            })
+            mutate = removed(product)
+        finally:
+            cart_cache.end_write(username, version, mutate)
 
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Item not found in cart")
@@ -132,10 +293,93 @@ async def clear_cart(username: str):
         cart_collection = db.cart
 
         # Remove all items from cart
-        result = await cart_collection.delete_many({"username": username})
+        version = cart_cache.begin_write(username)
+        mutate = None
+        try:
+            result = await cart_collection.delete_many({"username": username})
+            mutate = cleared()
+        finally:
+            cart_cache.end_write(username, version, mutate)
 
         return {"message": f"Removed {result.deleted_count} items from cart"}
 
     except Exception as e:
         logger.error(f"Error clearing cart: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+def build_bulk_operation(username: str, operation: Dict, added_at: datetime):
+    """Turn one bulk cart operation into a pymongo write"""
+    if not isinstance(operation, dict) or not isinstance(operation.get("item", {}), dict):
+        raise ValueError("Each operation must be an object with an op and an item")
+    op = operation.get("op")
+    item = operation.get("item", {})
+    if op == "add":
+        return InsertOne(build_cart_item(username, item, added_at))
+    if op == "update":
+        return UpdateOne({"username": username, "item.product": item.get("product")},
+                         {"$set": build_item_update(item)})
+    if op == "remove":
+        if "product" not in item:
+            raise ValueError("Missing required field: product")
+        return DeleteOne({"username": username, "item.product": item["product"]})
+    raise ValueError(f"Unknown op '{op}', use add, update or remove")
+
+@router.post("/bulk_cart")
+async def bulk_cart(request: Dict):
+    """Apply many add, update and remove operations to a user's cart in one write.
+
+    Operations run unordered, so one failing (e.g. adding an item that is
+    already in the cart) does not stop the others; failures are reported
+    per operation index.
+    """
+    try:
+        username = request.get("username")
+        operations = request.get("operations")
+        if not username or not isinstance(operations, list):
+            raise HTTPException(status_code=400, detail="Expected a username and a list of operations")
+        if len(operations) > CART_BULK_MAX_OPERATIONS:
+            raise HTTPException(status_code=400, detail=f"At most {CART_BULK_MAX_OPERATIONS} operations per request")
+
+        # Validate everything first; invalid operations are reported, not sent
+        added_at = datetime.utcnow()
+        writes, write_indices, errors = [], [], []
+        for index, operation in enumerate(operations):
+            try:
+                writes.append(build_bulk_operation(username, operation, added_at))
+                write_indices.append(index)
+            except (TypeError, ValueError) as e:
+                errors.append({"index": index, "error": str(e)})
+
+        result = {"inserted": 0, "matched": 0, "modified": 0, "removed": 0}
+        if writes:
+            db = await get_database()
+            # Many changes at once: drop the cached cart rather than replaying them
+            version = cart_cache.begin_write(username)
+            try:
+                outcome = (await db.cart.bulk_write(writes, ordered=False)).bulk_api_result
+            except BulkWriteError as e:
+                outcome = e.details
+                for write_error in outcome.get("writeErrors", []):
+                    duplicate = write_error.get("code") == DUPLICATE_KEY_ERROR
+                    errors.append({
+                        "index": write_indices[write_error["index"]],
+                        "error": "Item already exists in cart" if duplicate else write_error.get("errmsg", "Write failed")
+                    })
+            finally:
+                cart_cache.end_write(username, version)
+            result = {
+                "inserted": outcome.get("nInserted", 0),
+                "matched": outcome.get("nMatched", 0),
+                "modified": outcome.get("nModified", 0),
+                "removed": outcome.get("nRemoved", 0),
+            }
+
+        errors.sort(key=lambda error: error["index"])
+        logger.debug(f"Bulk cart update for {username}: {result}, {len(errors)} error(s)")
+        return {**result, "errors": errors}
+
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Error applying bulk cart update: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,144 @@
+# backend/cart_cache.py
+
+import itertools
+import logging
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+from responses import dumps
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Cart cache settings
+CART_CACHE_MAX_USERS = 10_000
+CART_CACHE_MAX_BYTES = 32 * 1024 * 1024
+CART_CACHE_MAX_ITEMS = 500           # Larger carts are always read from MongoDB
+CART_VERSION_LIMIT = 50_000          # Per-user write versions remembered
+
+class CartCache:
+    """LRU cache of whole carts per user, kept current by the cart writers.
+
+    Every write takes a new version for the user and is marked in flight
+    until it ends. A read only fills the cache if no write began since it
+    looked up the version and none is in flight, and a write only updates
+    a cached cart in place if no other write began meanwhile; otherwise
+    the cached cart is dropped and the next read reloads it.
+    """
+
+    def __init__(self, max_users: int = CART_CACHE_MAX_USERS, max_bytes: int = CART_CACHE_MAX_BYTES):
+        self.max_users = max_users
+        self.max_bytes = max_bytes
+        # username -> (items, size)
+        self._entries: "OrderedDict[str, Tuple[List[Dict], int]]" = OrderedDict()
+        self._bytes = 0
+        # username -> version of the user's latest write
+        self._versions: "OrderedDict[str, int]" = OrderedDict()
+        # Highest version forgotten from _versions; stands in for any user not listed
+        self._version_floor = 0
+        self._counter = itertools.count(1)
+        self._writing: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejected_fills = 0
+        self.write_throughs = 0
+        self.invalidations = 0
+
+    def get(self, username: str) -> Optional[List[Dict]]:
+        """Cached cart items, or None on a miss"""
+        entry = self._entries.get(username)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(username)
+        self.hits += 1
+        return entry[0]
+
+    def version(self, username: str) -> int:
+        """Current version, taken before reading a cart from MongoDB"""
+        return self._versions.get(username, self._version_floor)
+
+    def fill(self, username: str, items: List[Dict], version: int):
+        """Cache a cart read from MongoDB unless a write started after the read began"""
+        if self._writing.get(username) or self.version(username) != version:
+            self.rejected_fills += 1
+            return
+        self._store(username, items)
+
+    def begin_write(self, username: str) -> int:
+        """Mark a write in flight, returning its version"""
+        version = next(self._counter)
+        self._versions[username] = version
+        self._versions.move_to_end(username)
+        while len(self._versions) > CART_VERSION_LIMIT:
+            _, forgotten = self._versions.popitem(last=False)
+            self._version_floor = max(self._version_floor, forgotten)
+        self._writing[username] = self._writing.get(username, 0) + 1
+        return version
+
+    def end_write(self, username: str, version: int,
+                  mutate: Optional[Callable[[List[Dict]], List[Dict]]] = None):
+        """Finish a write, applying it to the cached cart or dropping the cart.
+
+        ``mutate`` returns the cart after the write; pass None when the
+        write failed or its effect is unknown.
+        """
+        remaining = self._writing.get(username, 1) - 1
+        if remaining:
+            self._writing[username] = remaining
+        else:
+            self._writing.pop(username, None)
+
+        entry = self._entries.get(username)
+        if entry is None:
+            return
+        if mutate is None or self.version(username) != version:
+            self._remove(username)
+            self.invalidations += 1
+            return
+        self._remove(username)
+        self._store(username, mutate(entry[0]))
+        self.write_throughs += 1
+
+    def invalidate(self, username: str):
+        """Drop a user's cart after a change made outside begin_write/end_write"""
+        self.end_write(username, self.begin_write(username))
+
+    def stats(self) -> Dict:
+        """Get cache counters"""
+        lookups = self.hits + self.misses
+        return {
+            "users": len(self._entries),
+            "items": sum(len(items) for items, _ in self._entries.values()),
+            "bytes": self._bytes,
+            "max_users": self.max_users,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "rejected_fills": self.rejected_fills,
+            "write_throughs": self.write_throughs,
+            "invalidations": self.invalidations,
+            "writes_in_flight": sum(self._writing.values()),
+        }
+
+    def _store(self, username: str, items: List[Dict]):
+        if len(items) > CART_CACHE_MAX_ITEMS:
+            return
+        size = len(dumps(items))
+        if size > self.max_bytes:
+            return
+        self._entries[username] = (items, size)
+        self._bytes += size
+        while len(self._entries) > self.max_users or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, username: str):
+        _, size = self._entries.pop(username)
+        self._bytes -= size
+
+cart_cache = CartCache()
@@ -0,0 +1,177 @@
+# backend/catalog.py
+
+import asyncio
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit, urlunsplit
+from pymongo import UpdateOne
+from db import get_database
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Catalog settings
+CATALOG_FLUSH_INTERVAL = 5           # Seconds between batched writes
+CATALOG_BATCH_SIZE = 500             # Buffered products that trigger an early write
+CATALOG_FRESHNESS = 1800             # Seconds a product counts as fresh after it was last seen
+CATALOG_MIN_RESULTS = 3              # Fresh matches needed per platform to skip the live scrape
+CATALOG_MAX_RESULTS = 10             # Products served per platform unless the request sets a cap
+PRICE_HISTORY_LIMIT = 30             # Price changes kept per product
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+def canonical_url(url: str) -> str:
+    """Product URL without query string, fragment or trailing slash"""
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path.rstrip("/"), "", ""))
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens used to match queries against product names"""
+    return sorted(set(TOKEN_PATTERN.findall(text.lower())))
+
+class ProductCatalog:
+    """Buffered writer and reader for the products collection"""
+
+    def __init__(self):
+        # (platform, canonical URL) -> latest sighting, written in batches
+        self._buffer: Dict[Tuple[str, str], Dict] = {}
+        self._flushing = False
+        # Early writes started by record(), kept so they are not lost or left unawaited
+        self._flush_tasks: Set[asyncio.Task] = set()
+        self.written = 0
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, platform: str, products: List[Dict]):
+        """Queue scraped products for the next batched write"""
+        seen = datetime.utcnow()
+        for product in products:
+            key = (platform, canonical_url(product["url"]))
+            self._buffer[key] = {**product, "seen": seen}
+        if len(self._buffer) >= CATALOG_BATCH_SIZE and not self._flushing:
+            task = asyncio.create_task(self.flush())
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_done)
+
+    def _flush_done(self, task: asyncio.Task):
+        self._flush_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Catalog flush task failed: {str(task.exception())}")
+
+    def _update(self, platform: str, url: str, entry: Dict) -> UpdateOne:
+        """Upsert one product, appending to its price history only when the price changed"""
+        price = entry["price"]
+        seen = entry["seen"]
+        history = {"$ifNull": ["$price_history", []]}
+        return UpdateOne(
+            {"platform": platform, "canonical_url": url},
+            [{"$set": {
+                "product": {"$literal": entry["product"]},
+                "display_name": {"$literal": entry["platform"]},
+                "delivery": {"$literal": entry["delivery"]},
+                "url": {"$literal": entry["url"]},
+                "image_url": {"$literal": entry["image_url"]},
+                "tokens": {"$literal": tokenize(entry["product"])},
+                "price": {"$literal": price},
+                "first_seen": {"$ifNull": ["$first_seen", seen]},
+                "last_seen": seen,
+                "price_history": {"$cond": [
+                    {"$eq": ["$price", price]},
+                    history,
+                    {"$slice": [
+                        {"$concatArrays": [history, [{"price": price, "at": seen}]]},
+                        -PRICE_HISTORY_LIMIT
+                    ]}
+                ]},
+            }}],
+            upsert=True
+        )
+
+    async def flush(self):
+        """Write buffered products to MongoDB in one bulk operation"""
+        if not self._buffer or self._flushing:
+            return
+        self._flushing = True
+        batch, self._buffer = self._buffer, {}
+        try:
+            operations = [self._update(platform, url, entry) for (platform, url), entry in batch.items()]
+            db = await get_database()
+            await db.products.bulk_write(operations, ordered=False)
+            self.written += len(operations)
+            logger.debug(f"Wrote {len(operations)} products to the catalog")
+        except Exception as e:
+            logger.error(f"Failed to write products to the catalog: {str(e)}")
+            # Keep the batch unless newer sightings replaced it meanwhile
+            for key, entry in batch.items():
+                self._buffer.setdefault(key, entry)
+        finally:
+            self._flushing = False
+
+    async def close(self):
+        """Wait for early writes in flight, then write whatever is still buffered"""
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+        await self.flush()
+
+    async def find_fresh(self, query_text: str, platforms: Tuple[str, ...],
+                         max_results: int = CATALOG_MAX_RESULTS) -> Optional[Dict[str, List[Dict]]]:
+        """Fresh catalog products matching every query token, per platform.
+
+        Returns None unless each platform has enough matches to stand in for
+        a live scrape.
+        """
+        tokens = tokenize(query_text)
+        if not tokens:
+            return None
+        try:
+            db = await get_database()
+            cursor = db.products.find(
+                {
+                    "tokens": {"$all": tokens},
+                    "platform": {"$in": list(platforms)},
+                    "last_seen": {"$gte": datetime.utcnow() - timedelta(seconds=CATALOG_FRESHNESS)},
+                },
+                {"_id": 0, "platform": 1, "product": 1, "price": 1, "display_name": 1,
+                 "delivery": 1, "url": 1, "image_url": 1}
+            ).sort("price", 1)
+            found: Dict[str, List[Dict]] = {platform: [] for platform in platforms}
+            async for doc in cursor:
+                results = found[doc["platform"]]
+                if len(results) < max_results:
+                    results.append({
+                        "product": doc["product"],
+                        "price": doc["price"],
+                        "platform": doc["display_name"],
+                        "delivery": doc["delivery"],
+                        "url": doc["url"],
+                        "image_url": doc.get("image_url")
+                    })
+        except Exception as e:
+            logger.error(f"Catalog lookup failed for '{query_text}': {str(e)}")
+            return None
+
+        needed = min(CATALOG_MIN_RESULTS, max_results)
+        if any(len(results) < needed for results in found.values()):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return found
+
+    def stats(self) -> Dict:
+        return {
+            "buffered": len(self._buffer),
+            "written": self.written,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+catalog = ProductCatalog()
+
+async def catalog_flush_loop():
+    """Periodically write buffered products to the catalog"""
+    while True:
+        await asyncio.sleep(CATALOG_FLUSH_INTERVAL)
+        await catalog.flush()
@@ -41,6 +41,14 @@ class User(BaseModel):
         user_dict = self.dict()
         await db.users.insert_one(user_dict)
 
+    async def update_password(self, hashed_password: str):
+        """Replace the stored password hash"""
+        global db
+        if db is None:
+            await connect_to_db()
+        await db.users.update_one({"username": self.username}, {"$set": {"hashed_password": hashed_password}})
+        self.hashed_password = hashed_password
+
 async def connect_to_db():
     """Initialize database connection"""
     global client, db
@@ -52,6 +60,10 @@ async def connect_to_db():
         # Create indexes
         await db.users.create_index("username", unique=True)
         await db.cart.create_index([("username", 1), ("item.product", 1)], unique=True)
+        await db.selector_stats.create_index([("platform", 1), ("group", 1), ("selector", 1)], unique=True)
+        await db.products.create_index([("platform", 1), ("canonical_url", 1)], unique=True)
+        await db.products.create_index([("tokens", 1), ("last_seen", -1)])
+        await db.products.create_index("last_seen")
         
         logger.info("Database initialized successfully")
     except Exception as e:
@@ -0,0 +1,108 @@
+# backend/hashing.py
+
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Password hashing settings
+BCRYPT_ROUNDS = 12                           # Cost factor for new hashes; weaker ones are upgraded at login
+HASH_POOL_WORKERS = os.cpu_count() or 2      # bcrypt releases the GIL, so threads use every core
+HASH_MAX_PENDING = HASH_POOL_WORKERS * 8     # Running plus queued jobs before new ones are turned away
+HASH_RETRY_AFTER = 1                         # Seconds clients are told to wait when turned away
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+# Global executor
+executor: Optional[ThreadPoolExecutor] = None
+
+# Hashing metrics
+pending = 0
+completed = 0
+rejected = 0
+hash_seconds_total = 0.0
+wait_seconds_total = 0.0
+upgraded = 0
+
+def init_hash_pool():
+    """Start the password hashing threads"""
+    global executor
+    if executor is None:
+        executor = ThreadPoolExecutor(max_workers=HASH_POOL_WORKERS, thread_name_prefix="bcrypt")
+        logger.info(f"Password hashing pool started: {HASH_POOL_WORKERS} threads, {BCRYPT_ROUNDS} rounds")
+
+def close_hash_pool():
+    """Shut down the password hashing threads"""
+    global executor
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+        executor = None
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+async def _run(func, *args):
+    """Run a bcrypt call on the pool, refusing it when the pool is saturated"""
+    global pending, completed, rejected, hash_seconds_total, wait_seconds_total
+    if pending >= HASH_MAX_PENDING:
+        rejected += 1
+        raise HTTPException(
+            status_code=503,
+            detail="Too many sign-ins in progress, please retry shortly",
+            headers={"Retry-After": str(HASH_RETRY_AFTER)},
+        )
+    if executor is None:
+        init_hash_pool()
+
+    loop = asyncio.get_running_loop()
+    submitted = time.perf_counter()
+    pending += 1
+    try:
+        result, seconds = await loop.run_in_executor(executor, _timed, func, *args)
+    finally:
+        pending -= 1
+    completed += 1
+    hash_seconds_total += seconds
+    wait_seconds_total += max(0.0, time.perf_counter() - submitted - seconds)
+    return result
+
+async def hash_password(password: str) -> str:
+    """Hash a new password off the event loop"""
+    return await _run(pwd_context.hash, password)
+
+async def verify_password(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Check a password off the event loop, returning (valid, upgraded hash or None).
+
+    A new hash is returned when the stored one uses fewer rounds than
+    BCRYPT_ROUNDS or a deprecated scheme, so the caller can store it.
+    """
+    global upgraded
+    valid, new_hash = await _run(pwd_context.verify_and_update, password, hashed_password)
+    if valid and new_hash:
+        upgraded += 1
+    return valid, new_hash
+
+def get_hash_stats() -> Dict:
+    """Get password hashing queue and timing metrics"""
+    return {
+        "workers": HASH_POOL_WORKERS,
+        "rounds": BCRYPT_ROUNDS,
+        "in_flight": pending,
+        "queue_depth": max(0, pending - HASH_POOL_WORKERS),
+        "max_pending": HASH_MAX_PENDING,
+        "completed": completed,
+        "rejected": rejected,
+        "upgraded": upgraded,
+        "hash_seconds_avg": hash_seconds_total / completed if completed else 0.0,
+        "queue_wait_seconds_avg": wait_seconds_total / completed if completed else 0.0,
+    }
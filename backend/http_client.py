@@ -0,0 +1,71 @@
+# backend/http_client.py
+
+import aiohttp
+import ssl
+import certifi
+import logging
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Connection pool settings
+DEFAULT_HOST_LIMIT = 8           # Max open connections to a host not listed below
+HOST_LIMITS = {                  # Per-host connection limits
+    "www.flipkart.com": 10,
+    "www.amazon.in": 10,
+    "www.meesho.com": 4,
+}
+DNS_CACHE_TTL = 300              # Seconds to keep resolved addresses
+KEEPALIVE_TIMEOUT = 30           # Seconds an idle connection stays in the pool
+DEFAULT_TIMEOUT = 30             # Default total request timeout in seconds
+
+# Create SSL context
+ssl_context = ssl.create_default_context(cafile=certifi.where())
+
+# One session (and connector) per host, shared for the app lifetime
+sessions: Dict[str, aiohttp.ClientSession] = {}
+
+def _create_session(host: str) -> aiohttp.ClientSession:
+    """Create a keep-alive session tuned for a single host"""
+    limit = HOST_LIMITS.get(host, DEFAULT_HOST_LIMIT)
+    connector = aiohttp.TCPConnector(
+        ssl=ssl_context,
+        limit=limit,
+        limit_per_host=limit,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        use_dns_cache=True,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+    )
+    timeout = aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT)
+    logger.info(f"Creating HTTP session for {host} (limit={limit})")
+    # Requests stay stateless: cookies set by one search must not leak into the next
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+        cookie_jar=aiohttp.DummyCookieJar(),
+    )
+
+async def init_http_sessions():
+    """Create the shared sessions for all known platform hosts"""
+    for host in HOST_LIMITS:
+        if host not in sessions or sessions[host].closed:
+            sessions[host] = _create_session(host)
+
+async def close_http_sessions():
+    """Close all shared sessions"""
+    for host, session in list(sessions.items()):
+        if not session.closed:
+            await session.close()
+        del sessions[host]
+
+def get_http_session(url: str) -> aiohttp.ClientSession:
+    """Get the shared session for the host of a URL"""
+    host = urlparse(url).netloc
+    session: Optional[aiohttp.ClientSession] = sessions.get(host)
+    if session is None or session.closed:
+        session = _create_session(host)
+        sessions[host] = session
+    return session
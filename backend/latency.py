@@ -0,0 +1,36 @@
+# backend/latency.py
+
+from collections import defaultdict, deque
+from typing import Deque, Dict, Optional
+
+class LatencyTracker:
+    """Rolling per-key latency samples with percentile lookups"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=self.window))
+
+    def record(self, key: str, seconds: float):
+        """Add a latency sample for a key"""
+        self._samples[key].append(seconds)
+
+    def percentile(self, key: str, pct: float) -> Optional[float]:
+        """Get a latency percentile, or None until enough samples exist"""
+        samples = self._samples.get(key)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def stats(self) -> Dict:
+        """Get p50/p95 per key"""
+        return {
+            key: {
+                "samples": len(samples),
+                "p50": self.percentile(key, 50),
+                "p95": self.percentile(key, 95),
+            }
+            for key, samples in self._samples.items()
+        }
@@ -1,10 +1,22 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
 import logging
 from db import connect_to_db, close_db_connection
-from queryhandler import router as query_router
+from http_client import init_http_sessions, close_http_sessions
+from parse_pool import init_parse_pool, close_parse_pool, get_parse_stats
+from hashing import init_hash_pool, close_hash_pool, get_hash_stats
+from selector_stats import selector_stats, selector_stats_flush_loop
+from catalog import catalog, catalog_flush_loop
+from rate_limit import get_rate_limit_stats
+from prewarm import prewarm_loop, get_prewarm_stats
+from queryhandler import router as query_router, query_cache, platform_flights, platform_latency, warm_query
 from cart import router as cart_router
+from cart_cache import cart_cache
+from revalidate import router as revalidate_router, revalidate_loop, get_revalidation_stats
 from auth import router as auth_router
+from responses import FastJSONResponse, CompressionMiddleware, get_response_stats
+from suggest import router as suggest_router, load_suggestions
 from speech_recognition_handler import router as speech_router
 
 # Set up logging
@@ -12,7 +24,10 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Create FastAPI app
-app = FastAPI(title="SmartShop API")
+app = FastAPI(title="SmartShop API", default_response_class=FastJSONResponse)
+
+# Background tasks started at startup and cancelled at shutdown
+background_tasks = []
 
 # Add CORS middleware
 app.add_middleware(
@@ -23,26 +38,77 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses for clients that accept br/gzip
+app.add_middleware(CompressionMiddleware)
+
 # Add startup and shutdown events
 @app.on_event("startup")
 async def startup():
     logger.info("Initializing database connection...")
     await connect_to_db()
     logger.info("Database initialized successfully!")
+    logger.info("Opening pooled HTTP sessions...")
+    await init_http_sessions()
+    logger.info("Starting parse pool...")
+    init_parse_pool()
+    logger.info("Starting password hashing pool...")
+    init_hash_pool()
+    logger.info("Loading selector stats...")
+    await selector_stats.load()
+    background_tasks.append(asyncio.create_task(selector_stats_flush_loop()))
+    background_tasks.append(asyncio.create_task(catalog_flush_loop()))
+    logger.info("Loading search suggestions...")
+    await load_suggestions()
+    logger.info("Starting pre-warm scheduler...")
+    background_tasks.append(asyncio.create_task(prewarm_loop(warm_query, query_cache.expires_in)))
+    logger.info("Starting cart price re-validation...")
+    background_tasks.append(asyncio.create_task(revalidate_loop()))
 
 @app.on_event("shutdown")
 async def shutdown():
+    for task in background_tasks:
+        task.cancel()
+    background_tasks.clear()
+    logger.info("Saving selector stats...")
+    await selector_stats.flush()
+    logger.info("Writing buffered catalog products...")
+    await catalog.close()
     logger.info("Closing database connection...")
     await close_db_connection()
     logger.info("Database connection closed!")
+    logger.info("Closing pooled HTTP sessions...")
+    await close_http_sessions()
+    logger.info("Stopping parse pool...")
+    close_parse_pool()
+    logger.info("Stopping password hashing pool...")
+    close_hash_pool()
 
 # Include routers
 app.include_router(auth_router)
 app.include_router(query_router)
 app.include_router(cart_router)
+app.include_router(revalidate_router)
+app.include_router(suggest_router)
 app.include_router(speech_router)
 
 # Root endpoint
 @app.get("/")
 async def root():
     return {"message": "Welcome to SmartShop API"}
+
+# Metrics endpoint
+@app.get("/metrics")
+async def metrics():
+    return {
+        "query_cache": query_cache.stats(),
+        "platform_flights": platform_flights.stats(),
+        "parse_pool": get_parse_stats(),
+        "password_hashing": get_hash_stats(),
+        "platform_latency": platform_latency.stats(),
+        "rate_limits": get_rate_limit_stats(),
+        "catalog": catalog.stats(),
+        "prewarm": get_prewarm_stats(),
+        "responses": get_response_stats(),
+        "cart_cache": cart_cache.stats(),
+        "cart_revalidation": get_revalidation_stats(),
+    }
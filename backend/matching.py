@@ -0,0 +1,105 @@
+# backend/matching.py
+
+import logging
+import re
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from units import extract_quantity, format_quantity, strip_quantities
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Matching settings
+MATCH_SIMILARITY_THRESHOLD = 0.6     # Cosine similarity of title tokens needed to link two products
+QUANTITY_TOLERANCE = 0.01            # Relative difference under which two quantities are equal
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = {"a", "an", "and", "the", "of", "for", "with", "in", "pack", "set", "combo", "new"}
+
+def normalize_title(title: str) -> List[str]:
+    """Title tokens without quantities, punctuation or filler words"""
+    return [token for token in TOKEN_PATTERN.findall(strip_quantities(title)) if token not in STOPWORDS]
+
+@lru_cache(maxsize=4096)
+def title_features(title: str) -> Tuple[Tuple[str, ...], Optional[Tuple[float, str]]]:
+    """Normalised tokens and quantity of a title; titles recur across searches"""
+    return tuple(normalize_title(title)), extract_quantity(title)
+
+def title_vectors(titles: List[Tuple[str, ...]]) -> np.ndarray:
+    """L2-normalised binary token vectors, one row per title"""
+    vocabulary: Dict[str, int] = {}
+    rows, cols = [], []
+    for row, tokens in enumerate(titles):
+        for token in set(tokens):
+            rows.append(row)
+            cols.append(vocabulary.setdefault(token, len(vocabulary)))
+    matrix = np.zeros((len(titles), max(len(vocabulary), 1)), dtype=np.float32)
+    matrix[rows, cols] = 1.0
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+def quantity_compatible(quantities: List[Optional[Tuple[float, str]]]) -> np.ndarray:
+    """Pairs whose quantities agree, or that both lack a quantity.
+
+    A title without a quantity is not matched with one that has it, since it
+    could otherwise join differently sized packs into one group.
+    """
+    units = {quantity[1] for quantity in quantities if quantity}
+    unit_codes = {unit: code for code, unit in enumerate(sorted(units))}
+    amounts = np.array([quantity[0] if quantity else np.nan for quantity in quantities])
+    codes = np.array([unit_codes[quantity[1]] if quantity else -1 for quantity in quantities])
+
+    unknown = codes < 0
+    both_unknown = unknown[:, None] & unknown[None, :]
+    same_unit = codes[:, None] == codes[None, :]
+    same_amount = np.isclose(amounts[:, None], amounts[None, :], rtol=QUANTITY_TOLERANCE, atol=0.0)
+    return both_unknown | (same_unit & same_amount)
+
+def connected_components(adjacency: np.ndarray) -> np.ndarray:
+    """Component label per node, by propagating the smallest index through the graph"""
+    n = adjacency.shape[0]
+    labels = np.arange(n)
+    while True:
+        neighbour_min = np.where(adjacency, labels[None, :], n).min(axis=1)
+        updated = np.minimum(labels, neighbour_min)
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+def group_products(results: List[Dict], threshold: float = MATCH_SIMILARITY_THRESHOLD) -> List[Dict]:
+    """Group equivalent products across platforms, cheapest group first"""
+    if not results:
+        return []
+    start = time.perf_counter()
+
+    features = [title_features(item["product"]) for item in results]
+    titles = [tokens for tokens, _ in features]
+    quantities = [quantity for _, quantity in features]
+
+    vectors = title_vectors(titles)
+    similarity = vectors @ vectors.T
+    adjacency = (similarity >= threshold) & quantity_compatible(quantities)
+    labels = connected_components(adjacency)
+
+    members: Dict[int, List[int]] = {}
+    for idx, label in enumerate(labels.tolist()):
+        members.setdefault(label, []).append(idx)
+
+    groups = []
+    for indices in members.values():
+        offers = sorted((results[idx] for idx in indices), key=lambda item: item["price"])
+        quantity = next((quantities[idx] for idx in indices if quantities[idx]), None)
+        groups.append({
+            "product": offers[0]["product"],
+            "quantity": format_quantity(quantity),
+            "best_price": offers[0]["price"],
+            "platforms": sorted({offer["platform"] for offer in offers}),
+            "offers": offers
+        })
+    groups.sort(key=lambda group: group["best_price"])
+
+    logger.debug(f"Grouped {len(results)} products into {len(groups)} groups in {(time.perf_counter() - start) * 1000:.2f}ms")
+    return groups
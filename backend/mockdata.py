@@ -1,128 +1,216 @@
 import logging
+from typing import Dict, List, Optional
+import numpy as np
 
-def get_mock_results(product_info: dict) -> list:
-    """Generate mock results based on product info."""
-    logger = logging.getLogger(__name__)
-    
-    # Base mock data with more products
-    mock_data = [
-        {
-            "product": "Amul Gold Milk 500ml",
-            "price": 30.00,
-            "platform": "BigBasket",
-            "delivery": 30
-        },
-        {
-            "product": "Amul Gold Milk 500ml",
-            "price": 32.00,
-            "platform": "Grofers",
-            "delivery": 45
-        },
-        {
-            "product": "Amul Taaza Milk 500ml",
-            "price": 25.00,
-            "platform": "BigBasket",
-            "delivery": 30
-        },
-        {
-            "product": "Amul Taaza Milk 500ml",
-            "price": 26.00,
-            "platform": "Grofers",
-            "delivery": 45
-        },
-        {
-            "product": "Amul Butter 500g",
-            "price": 250.00,
-            "platform": "BigBasket",
-            "delivery": 30
-        },
-        {
-            "product": "Amul Butter 500g",
-            "price": 245.00,
-            "platform": "Grofers",
-            "delivery": 45
-        },
-        {
-            "product": "Mother Dairy Full Cream Milk 500ml",
-            "price": 28.00,
-            "platform": "BigBasket",
-            "delivery": 30
-        },
-        {
-            "product": "Mother Dairy Full Cream Milk 500ml",
-            "price": 27.00,
-            "platform": "Grofers",
-            "delivery": 45
-        },
-        {
-            "product": "Mother Dairy Toned Milk 500ml",
-            "price": 24.00,
-            "platform": "BigBasket",
-            "delivery": 30
-        },
-        {
-            "product": "Mother Dairy Toned Milk 500ml",
-            "price": 23.00,
-            "platform": "Grofers",
-            "delivery": 45
-        }
-    ]
-    
-    # Get search terms from query
-    query = product_info.get("query", "").lower()
-    search_terms = query.split()
-    logger.info(f"[DEBUG] Search terms: {search_terms}")
-    
-    # Handle unit conversions
-    unit_mappings = {
-        'gms': ['g', 'gm', 'gram', 'grams', 'ml', 'milliliter', 'millilitre'],
-        'ml': ['milliliter', 'millilitre', 'milliliters', 'millilitres', 'g', 'gm', 'gms', 'gram']
+logger = logging.getLogger(__name__)
+
+# Base mock data with more products
+MOCK_DATA = [
+    {
+        "product": "Amul Gold Milk 500ml",
+        "price": 30.00,
+        "platform": "BigBasket",
+        "delivery": 30
+    },
+    {
+        "product": "Amul Gold Milk 500ml",
+        "price": 32.00,
+        "platform": "Grofers",
+        "delivery": 45
+    },
+    {
+        "product": "Amul Taaza Milk 500ml",
+        "price": 25.00,
+        "platform": "BigBasket",
+        "delivery": 30
+    },
+    {
+        "product": "Amul Taaza Milk 500ml",
+        "price": 26.00,
+        "platform": "Grofers",
+        "delivery": 45
+    },
+    {
+        "product": "Amul Butter 500g",
+        "price": 250.00,
+        "platform": "BigBasket",
+        "delivery": 30
+    },
+    {
+        "product": "Amul Butter 500g",
+        "price": 245.00,
+        "platform": "Grofers",
+        "delivery": 45
+    },
+    {
+        "product": "Mother Dairy Full Cream Milk 500ml",
+        "price": 28.00,
+        "platform": "BigBasket",
+        "delivery": 30
+    },
+    {
+        "product": "Mother Dairy Full Cream Milk 500ml",
+        "price": 27.00,
+        "platform": "Grofers",
+        "delivery": 45
+    },
+    {
+        "product": "Mother Dairy Toned Milk 500ml",
+        "price": 24.00,
+        "platform": "BigBasket",
+        "delivery": 30
+    },
+    {
+        "product": "Mother Dairy Toned Milk 500ml",
+        "price": 23.00,
+        "platform": "Grofers",
+        "delivery": 45
     }
-    
-    # Filter results based on search terms
-    if search_terms:
-        filtered_results = []
-        for item in mock_data:
-            product_text = item["product"].lower()
-            logger.info(f"[DEBUG] Checking product: {product_text}")
-            
-            # Check each search term
-            matches_all = True
-            for term in search_terms:
-                logger.info(f"[DEBUG] Checking term: {term}")
-                # Check direct match first
-                if term in product_text:
-                    logger.info(f"[DEBUG] Direct match found for term: {term}")
-                    continue
-                    
-                # Check for unit variations
-                term_matched = False
-                for unit, variants in unit_mappings.items():
-                    # If the term contains any variant, replace with the standard unit
-                    for variant in variants + [unit]:
-                        if variant in term:
-                            # Replace the variant with the standard unit in both strings
-                            normalized_term = term.replace(variant, unit)
-                            normalized_product = product_text.replace(variant, unit)
-                            logger.info(f"[DEBUG] Checking normalized term '{normalized_term}' against '{normalized_product}'")
-                            if normalized_term in normalized_product:
-                                term_matched = True
-                                logger.info(f"[DEBUG] Normalized match found!")
-                                break
-                    if term_matched:
-                        break
-                
-                if not term_matched:
-                    logger.info(f"[DEBUG] No match found for term: {term}")
-                    matches_all = False
-                    break
-            
-            if matches_all:
-                logger.info(f"[DEBUG] Adding product to results: {item['product']}")
-                filtered_results.append(item)
-        
-        logger.info(f"[DEBUG] Final results count: {len(filtered_results)}")
-        return filtered_results
-    
-    return mock_data
+]
+
+# Unit spellings treated as equivalent when matching search terms
+UNIT_MAPPINGS = {
+    'gms': ['g', 'gm', 'gram', 'grams', 'ml', 'milliliter', 'millilitre'],
+    'ml': ['milliliter', 'millilitre', 'milliliters', 'millilitres', 'g', 'gm', 'gms', 'gram']
+}
+
+# (variant, unit) rewrites tried for a term containing the variant
+UNIT_REWRITES = [
+    (variant, unit)
+    for unit, variants in UNIT_MAPPINGS.items()
+    for variant in variants + [unit]
+]
+
+# Distinct search terms whose matches are remembered
+TERM_CACHE_SIZE = 10000
+
+# Substrings up to this length are indexed; longer terms are checked against their grams' candidates
+GRAM_SIZE = 3
+# Stop intersecting gram posting lists once this few candidates are left to check
+GRAM_CANDIDATES = 64
+
+EMPTY = np.empty(0, dtype=np.int32)
+
+class SubstringIndex:
+    """Positions of the strings containing a term, found by dict lookups.
+
+    Every substring of up to GRAM_SIZE characters maps to the sorted
+    positions of the strings that contain it, so a short term is a single
+    lookup. A longer term intersects the posting lists of its grams,
+    rarest first, and only the strings left are checked with ``in``.
+    """
+
+    def __init__(self, strings: List[str]):
+        self.strings = strings
+        grams: Dict[str, List[int]] = {}
+        for pos, string in enumerate(strings):
+            for gram in {string[i:i + n] for n in range(1, GRAM_SIZE + 1) for i in range(len(string) - n + 1)}:
+                grams.setdefault(gram, []).append(pos)
+        self.grams = {gram: np.array(positions, dtype=np.int32) for gram, positions in grams.items()}
 
+    def find(self, term: str) -> np.ndarray:
+        """Sorted positions of the strings the term is a substring of"""
+        if len(term) <= GRAM_SIZE:
+            return self.grams.get(term, EMPTY)
+        postings = sorted(
+            (self.grams.get(term[i:i + GRAM_SIZE], EMPTY) for i in range(len(term) - GRAM_SIZE + 1)),
+            key=len
+        )
+        candidates = postings[0]
+        for positions in postings[1:]:
+            if len(candidates) <= GRAM_CANDIDATES:
+                break
+            candidates = np.intersect1d(candidates, positions, assume_unique=True)
+        strings = self.strings
+        return np.array([pos for pos in candidates.tolist() if term in strings[pos]], dtype=np.int32)
+
+class MockSearchIndex:
+    """Inverted index over product-name tokens.
+
+    A search term matches a product when it is a substring of one of the
+    product's tokens, or when, after rewriting a unit variant it contains
+    (e.g. "gram" -> "gms"), it is a substring of a token rewritten the same
+    way. Tokens and their unit-rewritten forms are indexed by substring at
+    build time, so resolving a term is a few dict lookups rather than a
+    pass over the vocabulary; resolved terms are cached and a query
+    intersects the terms' posting lists, so results keep catalog order.
+    """
+
+    def __init__(self, items: List[Dict]):
+        self.items = items
+        vocabulary: Dict[str, List[int]] = {}
+        for item_id, item in enumerate(items):
+            for token in set(item["product"].lower().split()):
+                vocabulary.setdefault(token, []).append(item_id)
+        self.tokens = list(vocabulary)
+        self.postings = [np.array(ids, dtype=np.int64) for ids in vocabulary.values()]
+        self.token_index = SubstringIndex(self.tokens)
+        # Each unit rewrite applied up front to the tokens it changes:
+        # (variant, unit) -> (mask of changed tokens, their positions, index of their rewritten forms)
+        self.rewritten = {}
+        for variant, unit in UNIT_REWRITES:
+            if variant == unit:
+                continue
+            changed = self.token_index.find(variant)
+            mask = np.zeros(len(self.tokens), dtype=bool)
+            mask[changed] = True
+            rewritten_tokens = [self.tokens[pos].replace(variant, unit) for pos in changed.tolist()]
+            self.rewritten[(variant, unit)] = (mask, changed, SubstringIndex(rewritten_tokens))
+        self._term_cache: Dict[str, np.ndarray] = {}
+
+    def _term_tokens(self, term: str) -> np.ndarray:
+        """Sorted vocabulary positions of the tokens a term matches"""
+        found = [self.token_index.find(term)]
+        for variant, unit in UNIT_REWRITES:
+            # Rewriting a unit to itself matches the same tokens as the term does
+            if variant == unit or variant not in term:
+                continue
+            normalized_term = term.replace(variant, unit)
+            mask, changed, index = self.rewritten[(variant, unit)]
+            # Tokens the rewrite leaves alone are compared as they are
+            unchanged = self.token_index.find(normalized_term)
+            found.append(unchanged[~mask[unchanged]])
+            found.append(changed[index.find(normalized_term)])
+        return found[0] if len(found) == 1 else np.unique(np.concatenate(found))
+
+    def match_term(self, term: str) -> np.ndarray:
+        """Sorted ids of the items a term matches"""
+        ids = self._term_cache.get(term)
+        if ids is None:
+            matched = self._term_tokens(term).tolist()
+            if len(matched) == 1:
+                ids = self.postings[matched[0]]
+            elif matched:
+                # Union the posting lists with a mask, which keeps ids sorted without a sort
+                mask = np.zeros(len(self.items), dtype=bool)
+                for idx in matched:
+                    mask[self.postings[idx]] = True
+                ids = np.flatnonzero(mask)
+            else:
+                ids = np.empty(0, dtype=np.int64)
+            if len(self._term_cache) >= TERM_CACHE_SIZE:
+                self._term_cache.clear()
+            self._term_cache[term] = ids
+        return ids
+
+    def search(self, query: str) -> List[Dict]:
+        """Items matching every term of the query, in catalog order"""
+        terms = query.lower().split()
+        if not terms:
+            return list(self.items)
+        # Intersect the shortest posting lists first
+        matches: Optional[np.ndarray] = None
+        for ids in sorted((self.match_term(term) for term in set(terms)), key=len):
+            matches = ids if matches is None else np.intersect1d(matches, ids, assume_unique=True)
+            if not len(matches):
+                break
+        return [self.items[item_id] for item_id in matches.tolist()]
+
+mock_index = MockSearchIndex(MOCK_DATA)
+
+def get_mock_results(product_info: dict) -> list:
+    """Generate mock results based on product info."""
+    query = product_info.get("query", "")
+    results = mock_index.search(query)
+    logger.debug(f"Mock search for '{query}' matched {len(results)} products")
+    return results
@@ -0,0 +1,133 @@
+# backend/page_reader.py
+
+import asyncio
+import codecs
+import logging
+from html.parser import HTMLParser
+from typing import Callable, Dict, Tuple
+import aiohttp
+
+# Optional C tokenizer for counting containers
+try:
+    from lxml import etree
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Streaming read settings
+READ_CHUNK_SIZE = 64 * 1024           # Bytes read from the connection at a time
+MAX_PAGE_BYTES = 4 * 1024 * 1024      # Hard cap on bytes read per search page
+CONTAINER_SLACK = 5                   # Extra containers read in case some yield no product
+
+# Elements that never have an end tag
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+
+# Read outcomes
+READ_COMPLETE = "complete"
+READ_ENOUGH = "enough_containers"
+READ_TRUNCATED = "max_bytes"
+
+class ContainerCounter:
+    """Counts closed top-level product containers from start/end tag events"""
+
+    def __init__(self, matcher: Callable[[str, Dict], bool]):
+        self.matcher = matcher
+        # Open elements as (tag, is_container)
+        self.stack = []
+        self.open_containers = 0
+        self.completed = 0
+
+    def start(self, tag, attrs):
+        if tag in VOID_ELEMENTS:
+            return
+        # Containers nested in a container are part of the same product card
+        is_container = self.open_containers == 0 and self.matcher(tag, attrs)
+        self.stack.append((tag, is_container))
+        if is_container:
+            self.open_containers += 1
+
+    def end(self, tag):
+        if tag in VOID_ELEMENTS or not any(open_tag == tag for open_tag, _ in self.stack):
+            return
+        # Close everything up to the matching start tag, like a browser would
+        while self.stack:
+            open_tag, is_container = self.stack.pop()
+            if is_container:
+                self.open_containers -= 1
+                self.completed += 1
+            if open_tag == tag:
+                break
+
+    def data(self, data):
+        pass
+
+    def close(self):
+        return self.completed
+
+class StdlibTagFeed(HTMLParser):
+    """html.parser front end for ContainerCounter, used without lxml"""
+
+    def __init__(self, counter: ContainerCounter, encoding: str):
+        super().__init__(convert_charrefs=False)
+        self.counter = counter
+        self.decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+
+    def feed_bytes(self, chunk: bytes):
+        self.feed(self.decoder.decode(chunk))
+
+    def handle_starttag(self, tag, attrs):
+        self.counter.start(tag, dict(attrs))
+
+    def handle_endtag(self, tag):
+        self.counter.end(tag)
+
+class LxmlTagFeed:
+    """libxml2 push parser front end for ContainerCounter; decodes and tokenizes in C"""
+
+    def __init__(self, counter: ContainerCounter, encoding: str):
+        self.parser = etree.HTMLParser(target=counter, encoding=encoding)
+
+    def feed_bytes(self, chunk: bytes):
+        self.parser.feed(chunk)
+
+def response_encoding(response: aiohttp.ClientResponse) -> str:
+    """Declared charset of a response, falling back to UTF-8"""
+    encoding = response.charset or "utf-8"
+    try:
+        return codecs.lookup(encoding).name
+    except LookupError:
+        return "utf-8"
+
+async def read_search_page(response: aiohttp.ClientResponse, matcher: Callable[[str, Dict], bool],
+                           wanted: int, encoding: str) -> Tuple[bytes, str]:
+    """Read a search page until enough containers have closed, returning (body, outcome).
+
+    The body is read in chunks and fed to an incremental parser that only
+    counts containers, so reading stops as soon as ``wanted`` containers
+    (plus some slack) are complete or ``MAX_PAGE_BYTES`` have been read,
+    without downloading the rest of the page. Chunks are tokenized on a
+    worker thread to keep the event loop free.
+    """
+    counter = ContainerCounter(matcher)
+    feed = LxmlTagFeed(counter, encoding) if HAS_LXML else StdlibTagFeed(counter, encoding)
+    loop = asyncio.get_running_loop()
+    chunks = []
+    size = 0
+    target = wanted + CONTAINER_SLACK
+    async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+        chunks.append(chunk)
+        size += len(chunk)
+        await loop.run_in_executor(None, feed.feed_bytes, chunk)
+        if counter.completed >= target:
+            return b"".join(chunks), READ_ENOUGH
+        if size >= MAX_PAGE_BYTES:
+            logger.warning(f"Stopped reading {response.url} at {size} bytes")
+            return b"".join(chunks), READ_TRUNCATED
+    return b"".join(chunks), READ_COMPLETE
@@ -0,0 +1,125 @@
+# backend/parse_pool.py
+
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+from registry import get_adapter
+from scrapers import DEFAULT_MAX_RESULTS
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Parse pool settings
+PARSE_POOL_KIND = "process"                  # "process", or "thread" to keep parsing in-process
+PARSE_POOL_WORKERS = os.cpu_count() or 2
+
+# Global executor
+executor: Optional[Executor] = None
+executor_kind: Optional[str] = None
+
+# Parse metrics
+pending = 0
+completed = 0
+failed = 0
+parse_seconds_total = 0.0
+parse_seconds_max = 0.0
+wait_seconds_total = 0.0
+
+def parse_html(platform: str, body: bytes, encoding: str,
+               selector_order: Optional[Dict[str, List[str]]] = None,
+               max_results: int = DEFAULT_MAX_RESULTS) -> Tuple[List[Dict], Dict, Dict, float]:
+    """Decode and parse a search page in a worker, returning (products, selector hits, selector misses, parse seconds)"""
+    start = time.perf_counter()
+    html = body.decode(encoding, errors="replace")
+    scraper = get_adapter(platform).create_scraper(selector_order=selector_order, max_results=max_results)
+    products = scraper.parse_search_results(html)
+    return products, scraper.selector_hits, scraper.selector_misses, time.perf_counter() - start
+
+def _create_executor(kind: str) -> Executor:
+    if kind == "process":
+        return ProcessPoolExecutor(max_workers=PARSE_POOL_WORKERS)
+    return ThreadPoolExecutor(max_workers=PARSE_POOL_WORKERS, thread_name_prefix="parse")
+
+def init_parse_pool():
+    """Start the parse pool, falling back to threads if processes are unavailable"""
+    global executor, executor_kind
+    if executor is not None:
+        return
+    try:
+        executor = _create_executor(PARSE_POOL_KIND)
+        executor_kind = PARSE_POOL_KIND
+    except (OSError, NotImplementedError, ImportError) as e:
+        logger.warning(f"Process parse pool unavailable ({str(e)}), using threads")
+        executor = _create_executor("thread")
+        executor_kind = "thread"
+    logger.info(f"Parse pool started: {executor_kind} x {PARSE_POOL_WORKERS}")
+
+def close_parse_pool():
+    """Shut down the parse pool"""
+    global executor, executor_kind
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+        executor = None
+        executor_kind = None
+
+async def parse_in_pool(platform: str, body: bytes, encoding: str,
+                        selector_order: Optional[Dict[str, List[str]]] = None,
+                        max_results: int = DEFAULT_MAX_RESULTS) -> Tuple[List[Dict], Dict, Dict]:
+    """Parse a search page off the event loop, returning (products, selector hits, selector misses).
+
+    The raw response bytes are handed to the worker and decoded there, so
+    large pages are neither decoded on the event loop nor re-encoded when
+    they are pickled across the process boundary.
+    """
+    global executor, executor_kind, pending, completed, failed
+    global parse_seconds_total, parse_seconds_max, wait_seconds_total
+    if executor is None:
+        init_parse_pool()
+
+    loop = asyncio.get_running_loop()
+    submitted = time.perf_counter()
+    pending += 1
+    try:
+        try:
+            products, selector_hits, selector_misses, parse_seconds = await loop.run_in_executor(
+                executor, parse_html, platform, body, encoding, selector_order, max_results
+            )
+        except BrokenProcessPool:
+            # A worker died; continue on threads rather than failing every search
+            logger.error("Process parse pool broke, falling back to threads")
+            executor = _create_executor("thread")
+            executor_kind = "thread"
+            products, selector_hits, selector_misses, parse_seconds = await loop.run_in_executor(
+                executor, parse_html, platform, body, encoding, selector_order, max_results
+            )
+    except Exception:
+        failed += 1
+        raise
+    finally:
+        pending -= 1
+
+    completed += 1
+    parse_seconds_total += parse_seconds
+    parse_seconds_max = max(parse_seconds_max, parse_seconds)
+    wait_seconds_total += max(0.0, time.perf_counter() - submitted - parse_seconds)
+    return products, selector_hits, selector_misses
+
+def get_parse_stats() -> Dict:
+    """Get parse pool queue depth and timing metrics"""
+    return {
+        "kind": executor_kind,
+        "workers": PARSE_POOL_WORKERS,
+        "in_flight": pending,
+        "queue_depth": max(0, pending - PARSE_POOL_WORKERS),
+        "completed": completed,
+        "failed": failed,
+        "parse_seconds_total": parse_seconds_total,
+        "parse_seconds_avg": parse_seconds_total / completed if completed else 0.0,
+        "parse_seconds_max": parse_seconds_max,
+        "queue_wait_seconds_avg": wait_seconds_total / completed if completed else 0.0,
+    }
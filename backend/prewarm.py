@@ -0,0 +1,123 @@
+# backend/prewarm.py
+
+import asyncio
+import heapq
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from rate_limit import CircuitBreaker, get_circuit_breaker, get_rate_limiter
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Pre-warming settings
+PREWARM_INTERVAL = 60            # Seconds between scheduling cycles
+PREWARM_TOP_N = 200              # Most popular queries considered each cycle
+PREWARM_PER_CYCLE = 20           # Most queries re-scraped in one cycle
+PREWARM_REFRESH_AHEAD = 60       # Warm entries that stop being fresh within this many seconds
+PREWARM_MISSING_STALENESS = 900  # Staleness assumed for queries with nothing cached
+PREWARM_DECAY = 0.9              # Popularity kept per cycle, so old favourites fade out
+PREWARM_MAX_TRACKED = 5000       # Queries whose popularity is tracked
+
+class QueryPopularity:
+    """Decaying request counts per cached query"""
+
+    def __init__(self, max_tracked: int = PREWARM_MAX_TRACKED):
+        self.max_tracked = max_tracked
+        # cache key -> {"query": str, "platforms": tuple, "count": float}
+        self._queries: Dict[Tuple, Dict] = {}
+
+    def record(self, key: Tuple, query_text: str, platforms: Tuple[str, ...]):
+        """Count one request for a query"""
+        entry = self._queries.setdefault(key, {"query": query_text, "platforms": platforms, "count": 0.0})
+        entry["count"] += 1
+        if len(self._queries) > self.max_tracked:
+            # Forget the least popular tenth rather than one entry per request
+            drop = heapq.nsmallest(self.max_tracked // 10 or 1, self._queries.items(), key=lambda item: item[1]["count"])
+            for dropped_key, _ in drop:
+                del self._queries[dropped_key]
+
+    def decay(self):
+        """Age all counts by one cycle"""
+        for key in list(self._queries):
+            entry = self._queries[key]
+            entry["count"] *= PREWARM_DECAY
+            if entry["count"] < 0.01:
+                del self._queries[key]
+
+    def top(self, n: int) -> List[Tuple[Tuple, Dict]]:
+        """The n most popular queries"""
+        return heapq.nlargest(n, self._queries.items(), key=lambda item: item[1]["count"])
+
+    def __len__(self) -> int:
+        return len(self._queries)
+
+query_popularity = QueryPopularity()
+
+# Scheduler counters
+prewarm_cycles = 0
+prewarm_warmed = 0
+prewarm_deferred = 0
+
+def build_queue(expires_in: Callable[[Tuple], Optional[float]]) -> List[Tuple[float, Tuple, Dict]]:
+    """Heap of popular queries due for a refresh, ordered by staleness x popularity"""
+    queue = []
+    for key, entry in query_popularity.top(PREWARM_TOP_N):
+        remaining = expires_in(key)
+        if remaining is not None and remaining > PREWARM_REFRESH_AHEAD:
+            continue
+        if remaining is None:
+            staleness = PREWARM_MISSING_STALENESS
+        else:
+            staleness = max(1.0, PREWARM_REFRESH_AHEAD - remaining)
+        heapq.heappush(queue, (-staleness * entry["count"], key, entry))
+    return queue
+
+def platforms_idle(platforms: Tuple[str, ...]) -> bool:
+    """Whether pre-warming may use the platforms without slowing user searches"""
+    for platform in platforms:
+        if get_circuit_breaker(platform).state != CircuitBreaker.CLOSED:
+            return False
+        bucket = get_rate_limiter(platform)
+        if bucket.available() < bucket.capacity:
+            return False
+    return True
+
+async def run_prewarm_cycle(warm: Callable[[Tuple, str, Tuple[str, ...]], Awaitable],
+                            expires_in: Callable[[Tuple], Optional[float]]):
+    """Re-scrape the highest priority queries that the rate limits allow"""
+    global prewarm_cycles, prewarm_warmed, prewarm_deferred
+    prewarm_cycles += 1
+    queue = build_queue(expires_in)
+    warmed = 0
+    while queue and warmed < PREWARM_PER_CYCLE:
+        _, key, entry = heapq.heappop(queue)
+        # Only spend request budget the platforms are not using for live searches
+        if not platforms_idle(entry["platforms"]):
+            prewarm_deferred += 1
+            continue
+        await warm(key, entry["query"], entry["platforms"])
+        warmed += 1
+    prewarm_warmed += warmed
+    query_popularity.decay()
+    if warmed:
+        logger.info(f"Pre-warmed {warmed} popular queries")
+
+async def prewarm_loop(warm: Callable[[Tuple, str, Tuple[str, ...]], Awaitable],
+                       expires_in: Callable[[Tuple], Optional[float]]):
+    """Periodically refresh popular queries before they go stale"""
+    while True:
+        await asyncio.sleep(PREWARM_INTERVAL)
+        try:
+            await run_prewarm_cycle(warm, expires_in)
+        except Exception as e:
+            logger.error(f"Pre-warm cycle failed: {str(e)}")
+
+def get_prewarm_stats() -> Dict:
+    """Get scheduler counters"""
+    return {
+        "tracked": len(query_popularity),
+        "cycles": prewarm_cycles,
+        "warmed": prewarm_warmed,
+        "deferred": prewarm_deferred,
+    }
@@ -1,13 +1,33 @@
 from fastapi import APIRouter, HTTPException
-from typing import Dict, List, Optional
+from fastapi.responses import StreamingResponse
+from typing import Dict, Iterable, List, Optional, Tuple
 import logging
-from bs4 import BeautifulSoup
 import aiohttp
 import asyncio
+import heapq
+import math
+import time
 from datetime import datetime
+from itertools import islice
 from fake_useragent import UserAgent
-import ssl
-import certifi
+from http_client import get_http_session
+from cache import TTLCache, FRESH, STALE
+from singleflight import SingleFlight
+from latency import LatencyTracker
+from registry import PLATFORMS, PlatformAdapter, get_adapter, resolve_platforms
+from parse_pool import parse_in_pool
+from page_reader import READ_COMPLETE, read_search_page, response_encoding
+from scrapers import DEFAULT_MAX_RESULTS
+from selector_stats import selector_stats
+from catalog import catalog
+from prewarm import query_popularity
+from matching import group_products
+from ranking import get_weights, rank_products
+from suggest import record_products, record_query
+from responses import FastJSONResponse, dumps
+from rate_limit import (
+    MAX_RETRIES, MAX_RETRY_AFTER, backoff_delay, get_circuit_breaker, get_rate_limiter, parse_retry_after
+)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -19,512 +39,546 @@ router = APIRouter(tags=["query"])
 # Initialize UserAgent
 ua = UserAgent()
 
-# Create SSL context
-ssl_context = ssl.create_default_context(cafile=certifi.where())
-
-class FlipkartScraper:
-    """Simplified Flipkart scraper based on SmartShop's implementation"""
-    
-    def get_search_url(self, query: str) -> str:
-        """Generate Flipkart search URL"""
-        clean_query = query.replace(' ', '%20')
-        return f"https://www.flipkart.com/search?q={clean_query}"
-
-    def extract_price(self, price_text: str) -> float:
-        """Extract price value from text"""
-        try:
-            # Remove currency symbol and commas, then convert to float
-            price = price_text.replace('₹', '').replace(',', '').strip()
-            return float(price)
-        except (ValueError, AttributeError):
-            return 0.0
-
-    def parse_search_results(self, html: str) -> List[Dict]:
-        """Parse Flipkart search results"""
-        products = []
-        soup = BeautifulSoup(html, 'html.parser')
-        
-        # Try different container selectors
-        selectors = [
-            'div._1AtVbE._4ddWXP',  # Updated selector
-            'div._1AtVbE',
-            'div._13oc-S',
-            'div._2kHMtA',
-            'div._4ddWXP',
-            'div._2B099V',
-            'div[data-id]'  # Fallback
-        ]
-        
-        product_containers = []
-        for selector in selectors:
-            containers = soup.select(selector)
-            if containers:
-                product_containers = containers
-                logger.info(f"Found {len(containers)} products using selector: {selector}")
-                # Log the first container's HTML for debugging
-                if containers:
-                    logger.debug(f"First container HTML: {containers[0]}")
-                break
-
-        for idx, container in enumerate(product_containers[:10]):  # Limit to 10 results
-            try:
-                logger.debug(f"Processing product container {idx + 1}")
-                
-                # Try to find any link first - most product info is in links
-                links = container.find_all('a')
-                if not links:
-                    logger.debug(f"No links found in container {idx + 1}")
-                    continue
-
-                # Try to find product name from link title or text
-                name = None
-                for link in links:
-                    if link.get('title'):
-                        name = link.get('title')
-                        break
-                    elif link.get_text(strip=True):
-                        name = link.get_text(strip=True)
-                        break
-
-                if not name:
-                    logger.debug(f"No name found in container {idx + 1}")
-                    continue
-
-                logger.debug(f"Found product name: {name}")
-
-                # Try to find price - look for ₹ symbol
-                price_text = None
-                price_candidates = container.find_all(text=lambda t: '₹' in str(t))
-                if price_candidates:
-                    price_text = price_candidates[0]
-                    logger.debug(f"Found price text: {price_text}")
-
-                if not price_text:
-                    logger.debug(f"No price found in container {idx + 1}")
-                    continue
-
-                price = self.extract_price(price_text)
-                if price == 0:
-                    logger.debug(f"Invalid price (0) for container {idx + 1}")
-                    continue
-
-                # Get product URL from the first link
-                url = 'https://www.flipkart.com' + links[0].get('href', '')
-
-                # Try to find image - look for any img tag
-                image_url = None
-                img_tag = container.find('img')
-                if img_tag:
-                    image_url = img_tag.get('src')
-
-                products.append({
-                    "product": name,
-                    "price": price,
-                    "platform": "Flipkart",
-                    "delivery": 30,
-                    "url": url,
-                    "image_url": image_url
-                })
-                logger.info(f"Successfully parsed product: {name} from Flipkart")
-
-            except Exception as e:
-                logger.error(f"Error parsing Flipkart product container {idx + 1}: {str(e)}")
-                logger.debug(f"Problematic container HTML: {container}")
-                continue
-
-        return products
-
-class AmazonScraper:
-    """Simplified Amazon scraper"""
-    
-    def get_search_url(self, query: str) -> str:
-        """Generate Amazon search URL"""
-        clean_query = query.replace(' ', '+')
-        return f"https://www.amazon.in/s?k={clean_query}"
-
-    def extract_price(self, price_text: str) -> float:
-        """Extract price value from text"""
-        try:
-            # Handle different price formats
-            price = price_text.replace('₹', '').replace(',', '').strip()
-            if '.' in price:  # Handle decimal prices
-                price = price.split('.')[0]
-            return float(price)
-        except (ValueError, AttributeError):
-            return 0.0
-
-    def parse_search_results(self, html: str) -> List[Dict]:
-        """Parse Amazon search results"""
-        products = []
-        soup = BeautifulSoup(html, 'html.parser')
-        
-        # Try different container selectors
-        selectors = [
-            'div.s-result-item[data-component-type="s-search-result"]',
-            'div.sg-col-4-of-12.s-result-item',
-            'div.sg-col-4-of-16.s-result-item',
-            'div.s-asin'
-        ]
-        
-        product_containers = []
-        for selector in selectors:
-            containers = soup.select(selector)
-            if containers:
-                product_containers = containers
-                logger.info(f"Found {len(containers)} products using selector: {selector}")
-                if containers:
-                    logger.debug(f"First container HTML: {containers[0]}")
-                break
-
-        for idx, container in enumerate(product_containers[:10]):
-            try:
-                logger.debug(f"Processing Amazon product container {idx + 1}")
-
-                # Skip sponsored products
-                if container.get('data-component-type') == "sp-sponsored-result":
-                    logger.debug("Skipping sponsored product")
-                    continue
-
-                # Try to find product name from h2 tags first
-                name = None
-                h2_tag = container.find('h2')
-                if h2_tag:
-                    name = h2_tag.get_text(strip=True)
-                
-                if not name:
-                    # Try finding any span with product text
-                    spans = container.find_all('span', class_=lambda x: x and ('a-text-normal' in x or 'a-color-base' in x))
-                    for span in spans:
-                        if span.get_text(strip=True):
-                            name = span.get_text(strip=True)
-                            break
-
-                if not name:
-                    logger.debug(f"No name found in container {idx + 1}")
-                    continue
-
-                logger.debug(f"Found product name: {name}")
-
-                # Try to find price - look for ₹ symbol first
-                price_text = None
-                price_candidates = container.find_all(text=lambda t: '₹' in str(t))
-                if price_candidates:
-                    price_text = price_candidates[0]
-                    logger.debug(f"Found price text: {price_text}")
-
-                if not price_text:
-                    # Try finding price in span tags
-                    price_spans = container.find_all('span', class_=lambda x: x and ('a-price' in x or 'a-color-price' in x))
-                    for span in price_spans:
-                        if '₹' in span.get_text():
-                            price_text = span.get_text()
-                            break
-
-                if not price_text:
-                    logger.debug(f"No price found in container {idx + 1}")
-                    continue
-
-                price = self.extract_price(price_text)
-                if price == 0:
-                    logger.debug(f"Invalid price (0) for container {idx + 1}")
-                    continue
-
-                # Get product URL
-                url_tag = container.find('a', class_=lambda x: x and ('a-link-normal' in x))
-                if not url_tag:
-                    url_tag = container.find('a')
-                
-                if not url_tag:
-                    logger.debug(f"No URL found in container {idx + 1}")
-                    continue
-
-                url = 'https://www.amazon.in' + url_tag.get('href', '')
-
-                # Try to find image
-                image_url = None
-                img_tag = container.find('img')
-                if img_tag:
-                    image_url = img_tag.get('src')
-
-                products.append({
-                    "product": name,
-                    "price": price,
-                    "platform": "Amazon",
-                    "delivery": 35,
-                    "url": url,
-                    "image_url": image_url
-                })
-                logger.info(f"Successfully parsed product: {name} from Amazon")
-
-            except Exception as e:
-                logger.error(f"Error parsing Amazon product container {idx + 1}: {str(e)}")
-                logger.debug(f"Problematic container HTML: {container}")
-                continue
-
-        return products
-
-class MeeshoScraper:
-    """Simplified Meesho scraper"""
-    
-    def get_search_url(self, query: str) -> str:
-        """Generate Meesho search URL"""
-        clean_query = query.replace(' ', '-')
-        return f"https://www.meesho.com/search?q={clean_query}"
-
-    def extract_price(self, price_text: str) -> float:
-        """Extract price value from text"""
-        try:
-            # Handle different price formats
-            price = price_text.replace('₹', '').replace(',', '').strip()
-            if 'from' in price.lower():
-                price = price.lower().split('from')[-1].strip()
-            if '.' in price:  # Handle decimal prices
-                price = price.split('.')[0]
-            return float(price)
-        except (ValueError, AttributeError):
-            return 0.0
-
-    def parse_search_results(self, html: str) -> List[Dict]:
-        """Parse Meesho search results"""
-        products = []
-        soup = BeautifulSoup(html, 'html.parser')
-        
-        # Try different container selectors
-        selectors = [
-            'div[data-testid="product-container"]',  # Most common
-            'div.ProductList__GridCol-sc-8lnc8o-0',
-            'div.NewProductCard__Base',
-            'div.ShopCard__StyledCard'  # New selector
-        ]
-        
-        product_containers = []
-        for selector in selectors:
-            containers = soup.select(selector)
-            if containers:
-                product_containers = containers
-                logger.info(f"Found {len(containers)} products using selector: {selector}")
-                break
-
-        for container in product_containers[:10]:  # Limit to 10 results
-            try:
-                # Extract product name - try multiple selectors
-                name_selectors = [
-                    'p[data-testid="product-name"]',  # Most common
-                    'p.Text__StyledText-sc-oo0kvp-0',
-                    'p.NewProductCard__ProductTitle_Desktop',
-                    'div.NewProductCard__ProductName',
-                    'p.ShopCard__ProductName'  # New selector
-                ]
-                name_element = None
-                for selector in name_selectors:
-                    name_element = container.select_one(selector)
-                    if name_element:
-                        logger.debug(f"Found name using selector: {selector}")
-                        break
-                
-                if not name_element:
-                    logger.debug("No name element found, skipping product")
-                    continue
-                name = name_element.get_text(strip=True)
-
-                # Extract price - try multiple selectors
-                price_selectors = [
-                    'h5[data-testid="product-price"]',  # Most common
-                    'h5.Text__StyledText-sc-oo0kvp-0',
-                    'div.NewProductCard__PriceRow',
-                    'h4.NewProductCard__DiscountedPriceText',
-                    'p.ShopCard__PriceParagraph'  # New selector
-                ]
-                price_element = None
-                for selector in price_selectors:
-                    price_element = container.select_one(selector)
-                    if price_element:
-                        logger.debug(f"Found price using selector: {selector}")
-                        break
-                
-                if not price_element:
-                    logger.debug("No price element found, skipping product")
-                    continue
-                price = self.extract_price(price_element.get_text(strip=True))
-
-                # Extract product URL - try multiple selectors
-                url_selectors = [
-                    'a[data-testid="product-link"]',  # Most common
-                    'a.NewProductCard__Anchor',
-                    'a.ShopCard__StyledAnchor'  # New selector
-                ]
-                url_element = None
-                for selector in url_selectors:
-                    url_element = container.select_one(selector)
-                    if url_element:
-                        logger.debug(f"Found URL using selector: {selector}")
-                        break
-                
-                if not url_element:
-                    logger.debug("No URL element found, skipping product")
-                    continue
-                url = 'https://www.meesho.com' + url_element.get('href', '')
-
-                # Extract image URL - try multiple selectors
-                img_selectors = [
-                    'img[data-testid="product-image"]',  # Most common
-                    'img.NewProductCard__Image',
-                    'img.ShopCard__Image'  # New selector
-                ]
-                img_element = None
-                for selector in img_selectors:
-                    img_element = container.select_one(selector)
-                    if img_element:
-                        logger.debug(f"Found image using selector: {selector}")
-                        break
-                
-                image_url = img_element.get('src') if img_element else None
-
-                products.append({
-                    "product": name,
-                    "price": price,
-                    "platform": "Meesho",
-                    "delivery": 40,  # Default delivery estimate
-                    "url": url,
-                    "image_url": image_url
-                })
-                logger.info(f"Successfully parsed product: {name} from Meesho")
-
-            except Exception as e:
-                logger.error(f"Error parsing Meesho product container: {str(e)}")
-                continue
-
-        return products
-
-async def search_platform(scraper, query: str, headers: Dict) -> List[Dict]:
-    """Search a specific platform"""
+# Result cache settings
+QUERY_CACHE_MAX_ENTRIES = 1000
+QUERY_CACHE_MAX_BYTES = 64 * 1024 * 1024
+QUERY_CACHE_TTL = 300            # Seconds a result set is served as fresh
+QUERY_CACHE_STALE_TTL = 900      # Extra seconds a result set may be served while refreshing
+SHORT_RESULT_TTL = 30            # Shorter TTL so partial or empty answers are retried soon
+
+# Cache of price-sorted results keyed on (normalized query, platforms)
+query_cache = TTLCache(
+    max_entries=QUERY_CACHE_MAX_ENTRIES,
+    max_bytes=QUERY_CACHE_MAX_BYTES,
+    ttl=QUERY_CACHE_TTL,
+    stale_ttl=QUERY_CACHE_STALE_TTL,
+)
+refresh_tasks: Dict[Tuple, asyncio.Task] = {}
+
+# Concurrent identical searches share one upstream request per platform
+platform_flights = SingleFlight()
+
+# Latency budget settings
+DEFAULT_LATENCY_BUDGET = 2.5     # Seconds a /query waits before answering with what it has
+MAX_LATENCY_BUDGET = 30.0        # Upper bound for caller-supplied budgets and background refreshes
+HEDGE_PERCENTILE = 95            # Send a hedged request once a platform passes this percentile
+
+# Read search pages in chunks and stop once enough product containers have arrived
+STREAMING_READ = True
+
+# Pagination settings
+DEFAULT_PAGE_LIMIT = 30          # Results per page when the request sets no limit
+MAX_PAGE_LIMIT = 100
+MAX_PER_PLATFORM_CAP = 50        # Most products a request may ask for from one platform
+COMBINED_DELIVERY_WEIGHT = 1.0   # Rupees one minute of delivery is worth in the combined sort
+
+# Sort orders: key function per "sort" value
+SORT_KEYS = {
+    "price": lambda item: (item["price"], item["delivery"]),
+    "delivery": lambda item: (item["delivery"], item["price"]),
+    "combined": lambda item: (item["price"] + item["delivery"] * COMBINED_DELIVERY_WEIGHT,),
+}
+# Weighted price, unit price and delivery score; scores depend on the whole result set
+SCORE_SORT = "score"
+SORT_ORDERS = (*SORT_KEYS, SCORE_SORT)
+
+# Per-platform search status
+STATUS_OK = "ok"
+STATUS_BLOCKED = "blocked"
+STATUS_RATE_LIMITED = "rate_limited"
+STATUS_HTTP_ERROR = "http_error"
+STATUS_TIMEOUT = "timeout"
+STATUS_NETWORK_ERROR = "network_error"
+STATUS_ERROR = "error"
+STATUS_BUDGET_EXCEEDED = "budget_exceeded"
+STATUS_CIRCUIT_OPEN = "circuit_open"
+
+# Recent successful search latencies per platform
+platform_latency = LatencyTracker()
+
+async def search_platform(adapter: PlatformAdapter, query: str, headers: Dict,
+                          max_results: int = DEFAULT_MAX_RESULTS) -> Tuple[str, List[Dict]]:
+    """Search a specific platform and return (status, results)"""
     try:
-        url = scraper.get_search_url(query)
-        conn = aiohttp.TCPConnector(ssl=ssl_context, limit=10)
+        url = adapter.get_search_url(query)
         timeout = aiohttp.ClientTimeout(total=30)
-        
-        # Add platform-specific headers
-        platform_headers = headers.copy()
-        if "meesho.com" in url:
-            # Add more browser-like headers for Meesho
-            platform_headers.update({
-                "sec-ch-ua": '"Not A(Brand";v="99", "Google Chrome";v="121", "Chromium";v="121"',
-                "sec-ch-ua-mobile": "?0",
-                "sec-ch-ua-platform": '"macOS"',
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
-                "Accept-Language": "en-GB,en-US;q=0.9,en;q=0.8",
-                "Accept-Encoding": "gzip, deflate, br",
-                "Referer": "https://www.meesho.com/",
-                "DNT": "1",
-                "sec-fetch-site": "same-origin",
-                "sec-fetch-mode": "navigate",
-                "sec-fetch-dest": "document",
-                "Cookie": "AMP_TOKEN=%24NOT_FOUND; _gcl_au=1.1.123456789.1234567890"
-            })
-            # Add a small delay for Meesho to avoid rate limiting
-            await asyncio.sleep(1)
-        elif "amazon.in" in url:
-            platform_headers.update({
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
-                "Accept-Language": "en-GB,en-US;q=0.9,en;q=0.8",
-                "Accept-Encoding": "gzip, deflate, br",
-                "Referer": "https://www.amazon.in/",
-                "sec-ch-ua": '"Not A(Brand";v="99", "Google Chrome";v="121", "Chromium";v="121"',
-                "sec-ch-ua-mobile": "?0",
-                "sec-ch-ua-platform": '"macOS"',
-                "Cookie": "session-id=123456789; i18n-prefs=INR; csm-hit=tb:s-XXXXX|1234567890"
-            })
-        elif "flipkart.com" in url:
-            platform_headers.update({
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
-                "Accept-Language": "en-GB,en-US;q=0.9,en;q=0.8",
-                "Accept-Encoding": "gzip, deflate, br",
-                "Referer": "https://www.flipkart.com/",
-                "sec-ch-ua": '"Not A(Brand";v="99", "Google Chrome";v="121", "Chromium";v="121"',
-                "sec-ch-ua-mobile": "?0",
-                "sec-ch-ua-platform": '"macOS"'
-            })
-
-        async with aiohttp.ClientSession(connector=conn, timeout=timeout) as session:
+
+        # Platform headers come from the registry; the user agent rotates per request
+        platform_headers = {**adapter.headers, **headers}
+
+        # Skip platforms that keep refusing us instead of burning the timeout
+        breaker = get_circuit_breaker(adapter.name)
+        if not breaker.allow():
+            logger.warning(f"Circuit open for {adapter.name}, skipping {url}")
+            return STATUS_CIRCUIT_OPEN, []
+        bucket = get_rate_limiter(adapter.name)
+
+        # Reuse the app-wide pooled session for this host
+        session = get_http_session(url)
+        for attempt in range(MAX_RETRIES + 1):
+            # Every in-flight query shares the platform's request budget
+            await bucket.acquire()
             try:
-                async with session.get(url, headers=platform_headers, allow_redirects=True) as response:
+                async with session.get(url, headers=platform_headers, allow_redirects=True, timeout=timeout) as response:
                     if response.status == 200:
-                        html = await response.text()
+                        if STREAMING_READ:
+                            # Stop downloading once the page has shown enough product containers
+                            encoding = response_encoding(response)
+                            body, outcome = await read_search_page(
+                                response, adapter.container_matcher, max_results, encoding
+                            )
+                            if outcome != READ_COMPLETE:
+                                response.close()
+                            logger.info(f"Read {len(body)} bytes from {url} ({outcome})")
+                        else:
+                            body = await response.read()
+                            encoding = response.get_encoding()
+                        breaker.record_success()
                         logger.info(f"Successfully fetched data from {url}")
-                        # Log the first 500 characters of HTML for debugging
-                        logger.debug(f"First 500 chars of response: {html[:500]}")
-                        results = scraper.parse_search_results(html)
+                        # Log the first 500 bytes of HTML for debugging
+                        logger.debug(f"First 500 bytes of response: {body[:500]}")
+                        # Parse off the event loop so large pages don't stall other requests
+                        results, selector_hits, selector_misses = await parse_in_pool(
+                            adapter.name, body, encoding,
+                            selector_stats.preferred_order(adapter.name, adapter.selectors), max_results
+                        )
+                        selector_stats.record(adapter.name, selector_hits, selector_misses)
+                        catalog.record(adapter.name, results)
+                        record_products([item["product"] for item in results])
                         logger.info(f"Successfully parsed {len(results)} products from {url}")
-                        return results
+                        return STATUS_OK, results
                     elif response.status == 403:
                         logger.error(f"Access forbidden (403) from {url}. The site may be blocking requests.")
-                        return []
-                    elif response.status == 429:
-                        logger.error(f"Too many requests (429) from {url}. Need to implement rate limiting.")
-                        return []
+                        breaker.record_failure()
+                        return STATUS_BLOCKED, []
+                    elif response.status in (429, 503):
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                        logger.error(f"Too many requests ({response.status}) from {url}. Retry-After: {retry_after}")
+                        if response.status == 429:
+                            breaker.record_failure(retry_after)
+                        delay = backoff_delay(attempt, retry_after)
+                        # Slow down every query to this platform, not just this one
+                        bucket.pause(delay)
+                        if attempt == MAX_RETRIES or delay > MAX_RETRY_AFTER or not breaker.allow():
+                            return STATUS_RATE_LIMITED, []
                     else:
                         logger.error(f"Failed to fetch data from {url}. Status: {response.status}")
-                        return []
+                        return STATUS_HTTP_ERROR, []
             except asyncio.TimeoutError:
                 logger.error(f"Timeout while fetching data from {url}")
-                return []
+                return STATUS_TIMEOUT, []
             except aiohttp.ClientError as e:
                 logger.error(f"Network error while fetching data from {url}: {str(e)}")
-                return []
+                return STATUS_NETWORK_ERROR, []
+
+            # The bucket is paused for the backoff delay, so the next acquire waits it out
+            logger.info(f"Retrying {url} in {delay:.2f}s (attempt {attempt + 2} of {MAX_RETRIES + 1})")
+
+        return STATUS_RATE_LIMITED, []
     except Exception as e:
         logger.error(f"Error searching platform: {str(e)}")
-        return []
+        return STATUS_ERROR, []
+
+def normalize_query(text: str) -> str:
+    """Normalize a search query for use as a cache key"""
+    return " ".join(text.lower().split())
+
+def build_headers() -> Dict:
+    """Use rotating user agents"""
+    return {"User-Agent": ua.random}
+
+async def search_with_budget(platform: str, query_text: str, headers: Dict, deadline: float,
+                             max_results: int = DEFAULT_MAX_RESULTS) -> Dict:
+    """Search one platform within the request's latency budget.
+
+    If the platform is still running past its recent p95 latency a second
+    (hedged) request is sent and whichever answers first wins. If one of them
+    fails, the other is still waited for. Searches that are not done by the
+    deadline are abandoned and reported as over budget.
+    """
+    adapter = get_adapter(platform)
+    start = time.monotonic()
+    hedge_after = platform_latency.percentile(platform, HEDGE_PERCENTILE)
+    hedged = False
+    status, results = STATUS_BUDGET_EXCEEDED, []
+    # A failed request only decides the outcome once no other request is left running
+    failure: Optional[Tuple[str, List[Dict]]] = None
+
+    # Identical in-flight searches share the primary request
+    primary = asyncio.ensure_future(platform_flights.do(
+        (normalize_query(query_text), platform, max_results),
+        lambda: search_platform(adapter, query_text, headers, max_results)
+    ))
+    pending = {primary}
+    try:
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            wait_for = remaining
+            if not hedged and hedge_after is not None:
+                wait_for = min(remaining, max(0.0, hedge_after - (time.monotonic() - start)))
+
+            done, pending = await asyncio.wait(pending, timeout=wait_for, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                try:
+                    outcome = task.result()
+                except Exception as e:
+                    logger.error(f"Platform search failed with error: {str(e)}")
+                    outcome = STATUS_ERROR, []
+                if outcome[0] == STATUS_OK:
+                    status, results = outcome
+                    break
+                if failure is None or task is primary:
+                    failure = outcome
+            if status == STATUS_OK:
+                break
+
+            if not done and not hedged and hedge_after is not None:
+                logger.info(f"{platform} slower than p95 ({hedge_after:.2f}s), sending hedged request")
+                hedged = True
+                pending.add(asyncio.ensure_future(search_platform(adapter, query_text, headers, max_results)))
+    finally:
+        # Drop whatever is still running; shared fetches keep going for their other callers
+        for task in pending:
+            task.cancel()
+
+    if status != STATUS_OK and not pending and failure is not None:
+        status, results = failure
+
+    elapsed = time.monotonic() - start
+    if status == STATUS_OK:
+        platform_latency.record(platform, elapsed)
+    elif status == STATUS_BUDGET_EXCEEDED:
+        logger.warning(f"{platform} missed the {elapsed:.2f}s latency budget, dropping it from the response")
+
+    return {
+        "platform": platform,
+        "status": status,
+        "results": results,
+        "elapsed_ms": round(elapsed * 1000),
+        "hedged": hedged
+    }
+
+def merge_page(streams: Iterable[List[Dict]], sort: str, offset: int, limit: int) -> List[Dict]:
+    """One page of the k-way merge of per-platform results in the requested order"""
+    sort_key = SORT_KEYS[sort]
+    # Each platform's results are few, so sorting them is cheap; the merge then
+    # only advances as far as the end of the requested page
+    sorted_streams = [sorted(results, key=sort_key) for results in streams]
+    return list(islice(heapq.merge(*sorted_streams, key=sort_key), offset, offset + limit))
+
+def build_payload(outcomes: List[Dict], per_platform_cap: int) -> Dict:
+    """Build the cacheable answer: per-platform results, product groups and status"""
+    platform_results = {outcome["platform"]: outcome["results"] for outcome in outcomes}
+    return {
+        "platform_results": platform_results,
+        "per_platform_cap": per_platform_cap,
+        "total": sum(len(results) for results in platform_results.values()),
+        "groups": group_products([item for results in platform_results.values() for item in results]),
+        "partial": any(outcome["status"] != STATUS_OK for outcome in outcomes),
+        "platforms": {
+            outcome["platform"]: {
+                "status": outcome["status"],
+                "count": len(outcome["results"]),
+                "elapsed_ms": outcome["elapsed_ms"],
+                "hedged": outcome["hedged"]
+            }
+            for outcome in outcomes
+        }
+    }
+
+def sort_results(results: List[Dict], page: Dict) -> List[Dict]:
+    """Results in the page's order, scored and annotated with unit prices for the score sort"""
+    if page["sort"] == SCORE_SORT:
+        return rank_products(results, page["weights"])
+    return sorted(results, key=SORT_KEYS[page["sort"]])
+
+def page_groups(groups: List[Dict], results: List[Dict]) -> List[Dict]:
+    """Groups with an offer on this page, their offers slimmed to references by url"""
+    urls = {item["url"] for item in results}
+    return [
+        {
+            **group,
+            "offers": [
+                {"url": offer["url"], "platform": offer["platform"], "price": offer["price"]}
+                for offer in group["offers"]
+            ]
+        }
+        for group in groups
+        if any(offer["url"] in urls for offer in group["offers"])
+    ]
+
+def render_page(payload: Dict, page: Dict) -> Dict:
+    """Build the response for one page of a cached or live answer"""
+    cap = page["per_platform_cap"]
+    streams = [results[:cap] for results in payload["platform_results"].values()]
+    groups = payload["groups"]
+    if cap < payload["per_platform_cap"]:
+        groups = group_products([item for results in streams for item in results])
+    if page["sort"] == SCORE_SORT:
+        results = rank_products([item for results in streams for item in results], page["weights"],
+                                page["offset"], page["limit"])
+    else:
+        results = merge_page(streams, page["sort"], page["offset"], page["limit"])
+    return {
+        "results": results,
+        "total": sum(len(results) for results in streams),
+        "offset": page["offset"],
+        "limit": page["limit"],
+        "sort": page["sort"],
+        "groups": page_groups(groups, results),
+        "partial": payload["partial"],
+        "platforms": payload["platforms"]
+    }
+
+def get_query_text(query: dict) -> str:
+    """Read the request's search text"""
+    query_text = query.get("query")
+    if not isinstance(query_text, str):
+        raise HTTPException(status_code=400, detail="query must be a string")
+    return query_text
+
+def get_budget(query: dict) -> float:
+    """Read the request's latency budget in seconds"""
+    raw = query.get("budget", DEFAULT_LATENCY_BUDGET)
+    try:
+        # bool is an int subclass, so float(True) would pass as 1 second
+        budget = math.nan if isinstance(raw, bool) else float(raw)
+    except (TypeError, ValueError):
+        budget = math.nan
+    if not math.isfinite(budget):
+        raise HTTPException(status_code=400, detail="budget must be a number of seconds")
+    return min(max(budget, 0.1), MAX_LATENCY_BUDGET)
+
+def get_page(query: dict) -> Dict:
+    """Read and validate the request's sort, pagination and per-platform cap"""
+    sort = query.get("sort", "price")
+    if sort not in SORT_ORDERS:
+        raise HTTPException(status_code=400, detail=f"Unknown sort '{sort}', use one of: {', '.join(SORT_ORDERS)}")
+    try:
+        weights = get_weights(query.get("weights"))
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    raw = (query.get("limit", DEFAULT_PAGE_LIMIT), query.get("offset", 0),
+           query.get("per_platform_cap", DEFAULT_MAX_RESULTS))
+    try:
+        # bool is an int subclass, so int(True) would pass as 1
+        if any(isinstance(value, bool) for value in raw):
+            raise TypeError("booleans are not integers")
+        limit, offset, cap = (int(value) for value in raw)
+    except (TypeError, ValueError, OverflowError):
+        raise HTTPException(status_code=400, detail="limit, offset and per_platform_cap must be integers")
+    if not 1 <= limit <= MAX_PAGE_LIMIT or offset < 0 or not 1 <= cap <= MAX_PER_PLATFORM_CAP:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Expected 1 <= limit <= {MAX_PAGE_LIMIT}, offset >= 0 and 1 <= per_platform_cap <= {MAX_PER_PLATFORM_CAP}"
+        )
+    return {"sort": sort, "weights": weights, "limit": limit, "offset": offset, "per_platform_cap": cap}
+
+def get_platforms(query: dict) -> Tuple[str, ...]:
+    """Read the requested platform subset, all registered platforms by default"""
+    platforms = query.get("platforms")
+    if platforms is not None and (not isinstance(platforms, list)
+                                  or not all(isinstance(platform, str) for platform in platforms)):
+        raise HTTPException(
+            status_code=400,
+            detail=f"platforms must be a list of platform names from: {', '.join(sorted(PLATFORMS))}"
+        )
+    try:
+        return resolve_platforms(platforms)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def run_search(query_text: str, platforms: Tuple[str, ...], budget: float,
+                     per_platform_cap: int = DEFAULT_MAX_RESULTS) -> Dict:
+    """Scrape the given platforms concurrently within a latency budget"""
+    deadline = time.monotonic() + budget
+    headers = build_headers()
+
+    # Wait for every platform to answer or run out of budget
+    outcomes = await asyncio.gather(*(
+        search_with_budget(platform, query_text, headers, deadline, per_platform_cap) for platform in platforms
+    ))
+    payload = build_payload(outcomes, per_platform_cap)
+
+    # Log the number of results found
+    logger.info(f"Found {payload['total']} total results across all platforms")
+
+    return payload
+
+def cache_ttl(payload: Dict) -> Optional[float]:
+    """Pick a cache TTL: short for partial or empty answers so they are retried soon"""
+    if payload["partial"] or not payload["total"]:
+        return SHORT_RESULT_TTL
+    return None
+
+async def refresh_cached_query(key: Tuple, query_text: str, platforms: Tuple[str, ...], per_platform_cap: int):
+    """Re-run a search in the background and store the fresh results"""
+    try:
+        payload = await run_search(query_text, platforms, MAX_LATENCY_BUDGET, per_platform_cap)
+        query_cache.set(key, payload, ttl=cache_ttl(payload))
+        logger.info(f"Refreshed cached results for '{query_text}'")
+    except Exception as e:
+        logger.error(f"Background refresh failed for '{query_text}': {str(e)}")
+    finally:
+        refresh_tasks.pop(key, None)
+
+def schedule_refresh(key: Tuple, query_text: str, platforms: Tuple[str, ...],
+                     per_platform_cap: int = DEFAULT_MAX_RESULTS):
+    """Start a background refresh for a key unless one is already running"""
+    if key not in refresh_tasks:
+        refresh_tasks[key] = asyncio.create_task(
+            refresh_cached_query(key, query_text, platforms, per_platform_cap)
+        )
+
+async def warm_query(key: Tuple, query_text: str, platforms: Tuple[str, ...]):
+    """Refresh a cached query ahead of demand, joining a refresh already running"""
+    # Keep the product count per platform the entry was cached with
+    cached = query_cache.peek(key)
+    cap = cached["per_platform_cap"] if cached is not None else DEFAULT_MAX_RESULTS
+    schedule_refresh(key, query_text, platforms, cap)
+    task = refresh_tasks.get(key)
+    if task is not None:
+        await task
+
+def store_payload(key: Tuple, query_text: str, platforms: Tuple[str, ...], payload: Dict):
+    """Cache a live answer, completing over-budget platforms in the background"""
+    query_cache.set(key, payload, ttl=cache_ttl(payload))
+    if any(info["status"] == STATUS_BUDGET_EXCEEDED for info in payload["platforms"].values()):
+        schedule_refresh(key, query_text, platforms, payload["per_platform_cap"])
+
+def get_cached_results(key: Tuple, query_text: str, platforms: Tuple[str, ...],
+                       per_platform_cap: int = DEFAULT_MAX_RESULTS) -> Optional[Dict]:
+    """Serve repeated searches from the result cache"""
+    cached, state = query_cache.get(key)
+    if cached is not None and cached["per_platform_cap"] < per_platform_cap:
+        # Cached with fewer products per platform than this request wants
+        return None
+    if state == FRESH:
+        logger.info(f"Cache hit for '{query_text}'")
+        return cached
+    if state == STALE:
+        # Serve the stale answer and refresh it in the background
+        logger.info(f"Serving stale results for '{query_text}' while refreshing")
+        schedule_refresh(key, query_text, platforms, cached["per_platform_cap"])
+        return cached
+    return None
+
+async def get_catalog_results(key: Tuple, query_text: str, platforms: Tuple[str, ...],
+                              per_platform_cap: int = DEFAULT_MAX_RESULTS) -> Optional[Dict]:
+    """Answer from fresh catalog products instead of scraping, when there are enough"""
+    found = await catalog.find_fresh(query_text, platforms, per_platform_cap)
+    if found is None:
+        return None
+    logger.info(f"Catalog hit for '{query_text}'")
+    payload = build_payload([
+        {"platform": platform, "status": STATUS_OK, "results": results, "elapsed_ms": 0, "hedged": False}
+        for platform, results in found.items()
+    ], per_platform_cap)
+    query_cache.set(key, payload)
+    return payload
 
 @router.post("/query")
 async def handle_query(query: dict):
     """Handle search query and return results from multiple platforms"""
     try:
-        # Initialize scrapers
-        scrapers = {
-            "flipkart": FlipkartScraper(),
-            "amazon": AmazonScraper(),
-            "meesho": MeeshoScraper()
-        }
-        
-        # Use rotating user agents and enhanced headers
-        headers = {
-            "User-Agent": ua.random,
-            "Connection": "keep-alive",
-            "Upgrade-Insecure-Requests": "1",
-            "Cache-Control": "max-age=0",
-            "sec-fetch-site": "none",
-            "sec-fetch-mode": "navigate",
-            "sec-fetch-user": "?1",
-            "sec-fetch-dest": "document",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Accept-Language": "en-GB,en-US;q=0.9,en;q=0.8"
-        }
+        query_text = get_query_text(query)
+        budget = get_budget(query)
+        page = get_page(query)
+        cap = page["per_platform_cap"]
+        platforms = get_platforms(query)
+        key = (normalize_query(query_text), platforms)
+        query_popularity.record(key, query_text, platforms)
+
+        payload = get_cached_results(key, query_text, platforms, cap)
+        if payload is None:
+            payload = await get_catalog_results(key, query_text, platforms, cap)
+        if payload is None:
+            payload = await run_search(query_text, platforms, budget, cap)
+            store_payload(key, query_text, platforms, payload)
+
+        # Searches that found something become suggestions
+        if payload["total"]:
+            record_query(query_text)
+
+        return FastJSONResponse(render_page(payload, page))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error processing query: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Search across platforms concurrently
-        tasks = []
-        for platform, scraper in scrapers.items():
-            task = search_platform(scraper, query["query"], headers)
-            tasks.append(task)
-        
-        # Wait for all searches to complete
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Process results
-        all_results = []
-        for platform_results in results:
-            if isinstance(platform_results, list):  # Skip any failed searches
-                all_results.extend(platform_results)
-            elif isinstance(platform_results, Exception):
-                logger.error(f"Platform search failed with error: {str(platform_results)}")
-
-        # Sort results by price
-        all_results.sort(key=lambda x: x["price"])
-        
-        # Log the number of results found
-        logger.info(f"Found {len(all_results)} total results across all platforms")
-        
-        return {"results": all_results}
+def ndjson_event(event: Dict) -> bytes:
+    """Serialize one streaming event as a line of NDJSON"""
+    return dumps(event) + b"\n"
 
+@router.post("/query/stream")
+async def stream_query(query: dict):
+    """Stream each platform's results as soon as they arrive, then a merged summary"""
+    try:
+        query_text = get_query_text(query)
+        budget = get_budget(query)
+        page = get_page(query)
+        cap = page["per_platform_cap"]
+        platforms = get_platforms(query)
+        key = (normalize_query(query_text), platforms)
+        query_popularity.record(key, query_text, platforms)
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error processing query: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        logger.error(f"Error processing streaming query: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+    cached = get_cached_results(key, query_text, platforms, cap)
+
+    async def events():
+        summary = cached
+        if summary is None:
+            summary = await get_catalog_results(key, query_text, platforms, cap)
+        if summary is not None:
+            if summary["total"]:
+                record_query(query_text)
+            yield ndjson_event({"event": "summary", **render_page(summary, page)})
+            return
+
+        deadline = time.monotonic() + budget
+        headers = build_headers()
+        tasks = [
+            asyncio.ensure_future(search_with_budget(platform, query_text, headers, deadline, cap))
+            for platform in platforms
+        ]
+        outcomes = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                outcome = await next_done
+                outcomes.append(outcome)
+                yield ndjson_event({
+                    "event": "platform",
+                    **outcome,
+                    "results": sort_results(outcome["results"], page)
+                })
+
+            payload = build_payload(outcomes, cap)
+            store_payload(key, query_text, platforms, payload)
+            if payload["total"]:
+                record_query(query_text)
+            logger.info(f"Streamed {payload['total']} total results across all platforms")
+            yield ndjson_event({"event": "summary", **render_page(payload, page)})
+        finally:
+            # Stop waiting if the client went away; shared fetches keep running for others
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@router.get("/selector_stats")
+async def get_selector_stats():
+    """Get per-platform selector hit statistics"""
+    return selector_stats.snapshot()
+
+@router.get("/platforms")
+async def list_platforms():
+    """List the platforms that can be searched"""
+    return [adapter.describe() for adapter in PLATFORMS.values()]
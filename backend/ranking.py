@@ -0,0 +1,122 @@
+# backend/ranking.py
+
+import logging
+import math
+import time
+from typing import Dict, List, Optional
+import numpy as np
+from matching import title_features
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Criteria weights when the request sets none; each criterion is scaled to [0, 1] first
+DEFAULT_WEIGHTS = {
+    "price": 1.0,
+    "unit_price": 1.0,
+    "delivery": 0.5,
+}
+
+# Base unit -> (amount a unit price is quoted for, label)
+UNIT_PRICE_BASIS = {
+    "g": (100.0, "100 g"),
+    "ml": (100.0, "100 ml"),
+    "pcs": (1.0, "pc"),
+}
+
+def get_weights(raw: Optional[Dict]) -> Dict[str, float]:
+    """Validate per-request weights, filling unset criteria from the defaults"""
+    if raw is None:
+        return dict(DEFAULT_WEIGHTS)
+    if not isinstance(raw, dict):
+        raise ValueError("weights must be an object")
+    unknown = set(raw) - set(DEFAULT_WEIGHTS)
+    if unknown:
+        raise ValueError(f"Unknown weight(s): {', '.join(sorted(unknown))}; use {', '.join(DEFAULT_WEIGHTS)}")
+    if not all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in raw.values()):
+        raise ValueError("weights must be numbers")
+    weights = {**DEFAULT_WEIGHTS, **{name: float(value) for name, value in raw.items()}}
+    if not all(math.isfinite(value) for value in weights.values()):
+        raise ValueError("weights must be finite")
+    if any(value < 0 for value in weights.values()) or not sum(weights.values()) > 0:
+        raise ValueError("weights must be non-negative and not all zero")
+    return weights
+
+def scale(values: np.ndarray) -> np.ndarray:
+    """Min-max scale to [0, 1] where 0 is best (lowest); NaNs stay NaN"""
+    if np.all(np.isnan(values)):
+        return values
+    low = np.nanmin(values)
+    spread = np.nanmax(values) - low
+    if spread == 0:
+        return np.where(np.isnan(values), np.nan, 0.0)
+    return (values - low) / spread
+
+def unit_prices(results: List[Dict], prices: np.ndarray):
+    """Price per quoted unit amount and base unit code (-1 if unknown) for each result"""
+    quantities = [title_features(item["product"])[1] for item in results]
+    unit_codes = {unit: code for code, unit in enumerate(UNIT_PRICE_BASIS)}
+    codes = np.array([unit_codes[quantity[1]] if quantity else -1 for quantity in quantities])
+    amounts = np.array([quantity[0] if quantity else np.nan for quantity in quantities])
+    basis = np.append([amount for amount, _ in UNIT_PRICE_BASIS.values()], np.nan)[codes]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        per_unit = np.where(amounts > 0, prices / amounts * basis, np.nan)
+    return per_unit, np.where(np.isnan(per_unit), -1, codes)
+
+def score_products(results: List[Dict], weights: Dict[str, float]):
+    """Score every result in [0, 1], higher is better, along with prices, unit prices and unit codes.
+
+    Unit prices are only compared between products measured in the same
+    unit. A product whose quantity is unknown uses its price score in
+    place of a unit price score.
+    """
+    prices = np.array([item["price"] for item in results], dtype=np.float64)
+    delivery = np.array([item["delivery"] for item in results], dtype=np.float64)
+    per_unit, codes = unit_prices(results, prices)
+
+    price_score = scale(prices)
+    delivery_score = scale(delivery)
+    unit_score = price_score.copy()
+    for code in np.unique(codes[codes >= 0]):
+        mask = codes == code
+        unit_score[mask] = scale(per_unit[mask])
+    unit_score = np.where(np.isnan(unit_score), price_score, unit_score)
+
+    total = sum(weights.values())
+    penalty = (weights["price"] * price_score
+               + weights["unit_price"] * unit_score
+               + weights["delivery"] * delivery_score) / total
+    return 1.0 - penalty, prices, per_unit, codes
+
+def rank_products(results: List[Dict], weights: Dict[str, float],
+                  offset: int = 0, limit: Optional[int] = None) -> List[Dict]:
+    """Best-scored results first, as copies with score and unit price added.
+
+    Everything is scored, but only the ``offset``/``limit`` slice of the
+    ranking is built into response dicts.
+    """
+    if not results:
+        return []
+    start = time.perf_counter()
+    scores, prices, per_unit, codes = score_products(results, weights)
+    # Cheaper first on equal scores
+    order = np.lexsort((prices, -scores))
+    order = order[offset:None if limit is None else offset + limit]
+
+    labels = [label for _, label in UNIT_PRICE_BASIS.values()]
+    page_scores = np.round(scores[order], 4).tolist()
+    page_unit_prices = np.round(per_unit[order], 2).tolist()
+    page_codes = codes[order].tolist()
+    ranked = [
+        {
+            **results[idx],
+            "score": score,
+            "unit_price": unit_price if code >= 0 else None,
+            "unit": labels[code] if code >= 0 else None,
+        }
+        for idx, score, unit_price, code in zip(order.tolist(), page_scores, page_unit_prices, page_codes)
+    ]
+
+    logger.debug(f"Ranked {len(results)} products in {(time.perf_counter() - start) * 1000:.2f}ms")
+    return ranked
@@ -0,0 +1,184 @@
+# backend/rate_limit.py
+
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Requests per second and burst size per platform
+PLATFORM_RATE_LIMITS = {
+    "flipkart": (5.0, 5),
+    "amazon": (5.0, 5),
+    "meesho": (1.0, 1),
+}
+DEFAULT_RATE_LIMIT = (2.0, 2)
+
+# Retry and circuit breaker settings
+MAX_RETRIES = 2                  # Retries after a 429/503 before giving up
+BACKOFF_BASE = 0.5               # Seconds; doubled on each retry
+MAX_RETRY_AFTER = 10.0           # Longest Retry-After we are willing to wait inside a request
+BREAKER_FAILURE_THRESHOLD = 3    # Consecutive 403/429s before the circuit opens
+BREAKER_COOLDOWN = 60.0          # Seconds a platform is skipped once the circuit opens
+BREAKER_TRIAL_TIMEOUT = 30.0     # Seconds before a half-open trial that never finished is retried
+
+class TokenBucket:
+    """Async token bucket shared by every in-flight request to one platform"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def available(self) -> float:
+        """Tokens that could be taken right now without waiting"""
+        now = time.monotonic()
+        if now < self._paused_until:
+            return 0.0
+        self._refill(now)
+        return self._tokens
+
+    def pause(self, seconds: float):
+        """Hold back all requests for a while, e.g. after a Retry-After"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def stats(self) -> Dict:
+        self._refill(time.monotonic())
+        return {
+            "rate": self.rate,
+            "capacity": self.capacity,
+            "tokens": round(self._tokens, 2),
+            "paused_for": round(max(0.0, self._paused_until - time.monotonic()), 2),
+        }
+
+class CircuitBreaker:
+    """Skip a platform for a cool-down period after repeated 403/429 responses"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, cooldown: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_until = 0.0
+        self.trial_started: Optional[float] = None
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        """Check whether a request may be sent now"""
+        if self.state == self.OPEN:
+            if time.monotonic() < self.opened_until:
+                self.rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+            self.trial_started = None
+        if self.state == self.HALF_OPEN:
+            # Let a single trial request through; a new one if it never reported back
+            now = time.monotonic()
+            if self.trial_started is not None and now - self.trial_started < BREAKER_TRIAL_TIMEOUT:
+                self.rejected += 1
+                return False
+            self.trial_started = now
+        return True
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trial_started = None
+
+    def record_failure(self, retry_after: Optional[float] = None):
+        self.failures += 1
+        self.trial_started = None
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            cooldown = max(self.cooldown, retry_after or 0.0)
+            self.state = self.OPEN
+            self.opened_until = time.monotonic() + cooldown
+            logger.warning(f"Circuit opened for {cooldown:.0f}s after {self.failures} failures")
+
+    def stats(self) -> Dict:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "open_for": round(max(0.0, self.opened_until - time.monotonic()), 2) if self.state == self.OPEN else 0.0,
+            "rejected": self.rejected,
+        }
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt: int, retry_after: Optional[float]) -> float:
+    """Delay before a retry: the server's Retry-After, else exponential backoff with jitter"""
+    if retry_after is not None:
+        return retry_after
+    return BACKOFF_BASE * (2 ** attempt) * (1 + random.random() * 0.25)
+
+def _create_bucket(platform: str) -> TokenBucket:
+    rate, capacity = PLATFORM_RATE_LIMITS.get(platform, DEFAULT_RATE_LIMIT)
+    return TokenBucket(rate, capacity)
+
+rate_limiters: Dict[str, TokenBucket] = {}
+circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+def get_rate_limiter(platform: str) -> TokenBucket:
+    """Get the shared token bucket for a platform"""
+    if platform not in rate_limiters:
+        rate_limiters[platform] = _create_bucket(platform)
+    return rate_limiters[platform]
+
+def get_circuit_breaker(platform: str) -> CircuitBreaker:
+    """Get the shared circuit breaker for a platform"""
+    if platform not in circuit_breakers:
+        circuit_breakers[platform] = CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_COOLDOWN)
+    return circuit_breakers[platform]
+
+def get_rate_limit_stats() -> Dict:
+    """Get bucket and breaker state per platform"""
+    platforms = set(rate_limiters) | set(circuit_breakers)
+    return {
+        platform: {
+            "bucket": get_rate_limiter(platform).stats(),
+            "breaker": get_circuit_breaker(platform).stats(),
+        }
+        for platform in sorted(platforms)
+    }
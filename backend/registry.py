@@ -0,0 +1,114 @@
+# backend/registry.py
+
+import json
+import logging
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import soupsieve
+from scrapers import DEFAULT_MAX_RESULTS, SCRAPER_TYPES, BaseScraper, compile_matcher
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Platform definitions: URLs, headers, price rules and selectors
+CONFIG_PATH = Path(__file__).parent / "platforms.json"
+
+def compile_price_parser(rules: Dict) -> Callable[[str], float]:
+    """Build a price extractor from a platform's price rules"""
+    strip = rules.get("strip", [])
+    after = rules.get("after")
+    drop_decimals = rules.get("drop_decimals", False)
+
+    def extract_price(price_text: str) -> float:
+        try:
+            text = price_text
+            for token in strip:
+                text = text.replace(token, '')
+            text = text.strip()
+            if after and after in text.lower():
+                text = text.lower().split(after)[-1].strip()
+            if drop_decimals:
+                text = text.split('.')[0]
+            return float(text)
+        except (ValueError, AttributeError):
+            return 0.0
+
+    return extract_price
+
+class PlatformAdapter:
+    """One platform's configuration with its selectors and price rules compiled"""
+
+    def __init__(self, name: str, config: Dict, header_profiles: Dict[str, Dict[str, str]]):
+        self.name = name
+        self.display_name = config["display_name"]
+        self.parser = config["parser"]
+        if self.parser not in SCRAPER_TYPES:
+            raise ValueError(f"Unknown parser '{self.parser}' for platform {name}")
+        self.search_url = config["search_url"]
+        self.query_space = config.get("query_space", "%20")
+        self.base_url = config["base_url"]
+        self.delivery = config["delivery"]
+
+        # Profiles are merged in order, then the platform's own headers
+        self.headers: Dict[str, str] = {}
+        for profile in config.get("headers", {}).get("profiles", []):
+            self.headers.update(header_profiles[profile])
+        self.headers.update(config.get("headers", {}).get("extra", {}))
+
+        self.selectors: Dict[str, List[str]] = config["selectors"]
+        self.compiled = {
+            selector: soupsieve.compile(selector)
+            for group in self.selectors.values()
+            for selector in group
+        }
+        self.container_matcher = compile_matcher(self.selectors["container"])
+        self.extract_price = compile_price_parser(config.get("price", {}))
+
+    def get_search_url(self, query: str) -> str:
+        """Generate search URL for the query"""
+        return self.search_url.format(query=query.replace(' ', self.query_space))
+
+    def create_scraper(self, backend: Optional[str] = None,
+                       selector_order: Optional[Dict[str, List[str]]] = None,
+                       max_results: int = DEFAULT_MAX_RESULTS) -> BaseScraper:
+        """Create a scraper for one parse"""
+        return SCRAPER_TYPES[self.parser](
+            self, backend=backend, selector_order=selector_order, max_results=max_results
+        )
+
+    def describe(self) -> Dict:
+        """Public description of the platform"""
+        return {
+            "name": self.name,
+            "display_name": self.display_name,
+            "base_url": self.base_url,
+            "delivery": self.delivery,
+        }
+
+def load_registry(path: Path = CONFIG_PATH) -> Dict[str, PlatformAdapter]:
+    """Read and compile every platform in the config file"""
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    profiles = config.get("header_profiles", {})
+    adapters = {
+        name: PlatformAdapter(name, platform_config, profiles)
+        for name, platform_config in config["platforms"].items()
+    }
+    logger.info(f"Loaded {len(adapters)} platform adapters from {path.name}")
+    return adapters
+
+PLATFORMS: Dict[str, PlatformAdapter] = load_registry()
+
+def get_adapter(platform: str) -> PlatformAdapter:
+    """Get the adapter for a platform"""
+    return PLATFORMS[platform]
+
+def resolve_platforms(requested: Optional[List[str]] = None) -> Tuple[str, ...]:
+    """Validate a requested platform subset; all platforms when none is given"""
+    if not requested:
+        return tuple(sorted(PLATFORMS))
+    unknown = [platform for platform in requested if platform not in PLATFORMS]
+    if unknown:
+        raise ValueError(f"Unknown platforms: {', '.join(unknown)}")
+    return tuple(sorted(set(requested)))
@@ -0,0 +1,203 @@
+# backend/responses.py
+
+import gzip
+import logging
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Optional fast JSON encoder
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    import json
+    HAS_ORJSON = False
+
+# Optional brotli encoder
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Compression settings
+COMPRESSION_MIN_SIZE = 1024          # Bytes; smaller bodies are sent as they are
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4                   # Low qualities compress JSON well at a fraction of the CPU
+
+if HAS_ORJSON:
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def dumps(content: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON, with orjson when it is installed"""
+    if HAS_ORJSON:
+        return orjson.dumps(content, default=str, option=ORJSON_OPTIONS)
+    return json.dumps(content, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class ResponseStats:
+    """Serialization time and response sizes before and after compression"""
+
+    def __init__(self):
+        self.serialized = 0
+        self.serialize_seconds_total = 0.0
+        self.serialize_seconds_max = 0.0
+        self.serialized_bytes = 0
+        # endpoint -> counters
+        self.endpoints: Dict[str, Dict[str, float]] = defaultdict(lambda: {
+            "responses": 0, "compressed": 0, "body_bytes": 0, "wire_bytes": 0, "compress_seconds": 0.0
+        })
+
+    def record_serialization(self, seconds: float, size: int):
+        self.serialized += 1
+        self.serialize_seconds_total += seconds
+        self.serialize_seconds_max = max(self.serialize_seconds_max, seconds)
+        self.serialized_bytes += size
+
+    def record_response(self, endpoint: str, body_bytes: int, wire_bytes: int,
+                        compress_seconds: float = 0.0, compressed: bool = False):
+        counters = self.endpoints[endpoint]
+        counters["responses"] += 1
+        counters["compressed"] += int(compressed)
+        counters["body_bytes"] += body_bytes
+        counters["wire_bytes"] += wire_bytes
+        counters["compress_seconds"] += compress_seconds
+
+    def stats(self) -> Dict:
+        return {
+            "encoder": "orjson" if HAS_ORJSON else "json",
+            "compression": ["br", "gzip"] if HAS_BROTLI else ["gzip"],
+            "serialized": self.serialized,
+            "serialize_seconds_total": self.serialize_seconds_total,
+            "serialize_seconds_avg": self.serialize_seconds_total / self.serialized if self.serialized else 0.0,
+            "serialize_seconds_max": self.serialize_seconds_max,
+            "serialized_bytes_avg": self.serialized_bytes / self.serialized if self.serialized else 0.0,
+            "endpoints": {
+                endpoint: {
+                    **counters,
+                    "body_bytes_avg": counters["body_bytes"] / counters["responses"],
+                    "wire_bytes_avg": counters["wire_bytes"] / counters["responses"],
+                }
+                for endpoint, counters in self.endpoints.items()
+            },
+        }
+
+response_stats = ResponseStats()
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when available, with timing recorded.
+
+    Endpoints that build large payloads return this directly, which also
+    skips FastAPI's jsonable_encoder pass over the result.
+    """
+
+    def render(self, content: Any) -> bytes:
+        start = time.perf_counter()
+        body = dumps(content)
+        response_stats.record_serialization(time.perf_counter() - start, len(body))
+        return body
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Preferred supported content coding in an Accept-Encoding header"""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            accepted[coding.strip()] = quality
+    for coding in ("br", "gzip") if HAS_BROTLI else ("gzip",):
+        if accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+def compress(body: bytes, coding: str) -> bytes:
+    if coding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+class CompressionMiddleware:
+    """Compress complete responses with brotli or gzip, as the client accepts.
+
+    Bodies under ``minimum_size``, already encoded responses and streamed
+    responses (whose first body message has more to follow) are passed
+    through unchanged so NDJSON events still reach the client as they are
+    produced.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        coding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        start_message: Optional[Message] = None
+        streaming = False
+        streamed_bytes = 0
+
+        def endpoint_name() -> str:
+            # Set on the scope by the router once the request is matched
+            endpoint = scope.get("endpoint")
+            return getattr(endpoint, "__name__", None) or scope.get("path", "")
+
+        async def send_wrapper(message: Message):
+            nonlocal start_message, streaming, streamed_bytes
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if streaming:
+                streamed_bytes += len(body)
+                if not message.get("more_body", False):
+                    response_stats.record_response(endpoint_name(), streamed_bytes, streamed_bytes)
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            if message.get("more_body", False):
+                streaming = True
+                streamed_bytes = len(body)
+                await send(start_message)
+                await send(message)
+                return
+
+            if coding is None or len(body) < self.minimum_size or "content-encoding" in headers:
+                response_stats.record_response(endpoint_name(), len(body), len(body))
+                await send(start_message)
+                await send(message)
+                return
+
+            started = time.perf_counter()
+            compressed = compress(body, coding)
+            response_stats.record_response(endpoint_name(), len(body), len(compressed),
+                                           time.perf_counter() - started, compressed=True)
+            headers["Content-Encoding"] = coding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+def get_response_stats() -> Dict:
+    """Get serialization and compression metrics"""
+    return response_stats.stats()
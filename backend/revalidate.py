@@ -0,0 +1,202 @@
+# backend/revalidate.py
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from fastapi import APIRouter, HTTPException
+from pymongo import UpdateMany
+from db import get_database
+from registry import PLATFORMS
+from catalog import CATALOG_FRESHNESS, canonical_url
+from cart_cache import cart_cache
+from queryhandler import STATUS_OK, build_headers, search_platform
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Create router
+router = APIRouter(tags=["cart"])
+
+# Re-validation settings
+REVALIDATE_INTERVAL = 3600           # Seconds between background re-validations of every cart
+REVALIDATE_CONCURRENCY = 4           # Product searches in flight at once
+REVALIDATE_MAX_RESULTS = 20          # Search results scanned for a cart item's URL
+PRICE_TOLERANCE = 0.005              # Rupees under which a price counts as unchanged
+
+# Only one re-validation runs at a time
+revalidate_lock = asyncio.Lock()
+last_run: Dict = {}
+
+# Cart platform display name -> registry adapter
+ADAPTERS_BY_DISPLAY_NAME = {adapter.display_name: adapter for adapter in PLATFORMS.values()}
+
+async def load_cart_products(usernames: Optional[List[str]]) -> Dict[Tuple[str, str], Dict]:
+    """Distinct products in the selected carts, keyed on (platform, canonical URL)"""
+    match = {"item.url": {"$type": "string"}}
+    if usernames is not None:
+        match["username"] = {"$in": usernames}
+    db = await get_database()
+    cursor = db.cart.aggregate([
+        {"$match": match},
+        {"$group": {
+            "_id": "$item.url",
+            "product": {"$first": "$item.product"},
+            "platform": {"$first": "$item.platform"},
+            "users": {"$addToSet": "$username"},
+            "prices": {"$addToSet": "$item.price"},
+        }},
+    ], batchSize=1000)
+
+    products: Dict[Tuple[str, str], Dict] = {}
+    async for doc in cursor:
+        key = (doc["platform"], canonical_url(doc["_id"]))
+        product = products.setdefault(key, {"product": doc["product"], "urls": [], "users": set(), "prices": set()})
+        product["urls"].append(doc["_id"])
+        product["users"].update(doc["users"])
+        product["prices"].update(doc["prices"])
+    return products
+
+async def catalog_prices(products: Dict[Tuple[str, str], Dict]) -> Dict[Tuple[str, str], float]:
+    """Prices of cart products the catalog saw recently enough to trust"""
+    display_names = {adapter.name: adapter.display_name for adapter in PLATFORMS.values()}
+    urls = [url for _, url in products]
+    db = await get_database()
+    cursor = db.products.find(
+        {
+            "canonical_url": {"$in": urls},
+            "last_seen": {"$gte": datetime.utcnow() - timedelta(seconds=CATALOG_FRESHNESS)},
+        },
+        {"_id": 0, "platform": 1, "canonical_url": 1, "price": 1}
+    )
+    found = {}
+    async for doc in cursor:
+        key = (display_names.get(doc["platform"]), doc["canonical_url"])
+        if key in products:
+            found[key] = doc["price"]
+    return found
+
+async def search_prices(products: Dict[Tuple[str, str], Dict]) -> Tuple[Dict[Tuple[str, str], float], int]:
+    """Re-search each distinct (platform, product name) once and pick out the cart URLs.
+
+    Returns the prices found and the number of searches made.
+    """
+    searches: Dict[Tuple[str, str], List[str]] = {}
+    for platform, url in products:
+        searches.setdefault((platform, products[(platform, url)]["product"]), []).append(url)
+
+    semaphore = asyncio.Semaphore(REVALIDATE_CONCURRENCY)
+    headers = build_headers()
+    found: Dict[Tuple[str, str], float] = {}
+
+    async def search(platform: str, product: str, urls: List[str]):
+        adapter = ADAPTERS_BY_DISPLAY_NAME.get(platform)
+        if adapter is None:
+            return
+        async with semaphore:
+            status, results = await search_platform(adapter, product, headers, REVALIDATE_MAX_RESULTS)
+        if status != STATUS_OK:
+            logger.debug(f"Re-validation search for '{product}' on {platform} returned {status}")
+            return
+        prices = {canonical_url(result["url"]): result["price"] for result in results}
+        for url in urls:
+            if url in prices:
+                found[(platform, url)] = prices[url]
+
+    await asyncio.gather(*(search(platform, product, urls) for (platform, product), urls in searches.items()))
+    return found, len(searches)
+
+async def revalidate_carts(usernames: Optional[List[str]] = None) -> Dict:
+    """Refresh cart prices for some users, or every cart, and return a summary"""
+    async with revalidate_lock:
+        start = time.perf_counter()
+        products = await load_cart_products(usernames)
+
+        prices = await catalog_prices(products) if products else {}
+        from_catalog = len(prices)
+        searches = 0
+        remaining = {key: product for key, product in products.items() if key not in prices}
+        if remaining:
+            searched, searches = await search_prices(remaining)
+            prices.update(searched)
+
+        # One UpdateMany per product covers every cart row holding it
+        now = datetime.utcnow()
+        scope = {} if usernames is None else {"username": {"$in": usernames}}
+        operations = []
+        affected_users = set()
+        changed_products = 0
+        for key, price in prices.items():
+            product = products[key]
+            affected_users.update(product["users"])
+            changed_products += any(abs(old - price) > PRICE_TOLERANCE for old in product["prices"])
+            changed = {"$gt": [{"$abs": {"$subtract": ["$item.price", price]}}, PRICE_TOLERANCE]}
+            operations.append(UpdateMany(
+                {**scope, "item.url": {"$in": product["urls"]}},
+                [{"$set": {
+                    "item.price_changed": changed,
+                    "item.previous_price": {"$cond": [changed, "$item.price", "$item.previous_price"]},
+                    "item.price": {"$literal": price},
+                    "item.checked_at": now,
+                }}]
+            ))
+
+        rows_updated = 0
+        if operations:
+            versions = {username: cart_cache.begin_write(username) for username in affected_users}
+            try:
+                db = await get_database()
+                result = await db.cart.bulk_write(operations, ordered=False)
+                rows_updated = result.modified_count
+            finally:
+                # Cached carts are reloaded rather than patched with the new prices
+                for username, version in versions.items():
+                    cart_cache.end_write(username, version)
+
+        summary = {
+            "carts": "all" if usernames is None else len(usernames),
+            "products": len(products),
+            "from_catalog": from_catalog,
+            "searches": searches,
+            "checked": len(prices),
+            "not_found": len(products) - len(prices),
+            "price_changes": changed_products,
+            "rows_updated": rows_updated,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000),
+            "finished_at": datetime.utcnow().isoformat(),
+        }
+        last_run.clear()
+        last_run.update(summary)
+        logger.info(f"Re-validated {len(prices)}/{len(products)} cart products with {searches} searches")
+        return summary
+
+async def revalidate_loop():
+    """Periodically re-check the prices in every cart"""
+    while True:
+        await asyncio.sleep(REVALIDATE_INTERVAL)
+        try:
+            await revalidate_carts()
+        except Exception as e:
+            logger.error(f"Cart re-validation failed: {str(e)}")
+
+@router.post("/revalidate_cart")
+async def revalidate_cart(request: Dict):
+    """Re-check cart prices for the given usernames, or for every cart if none are given"""
+    try:
+        usernames = request.get("usernames")
+        if usernames is not None and (not isinstance(usernames, list)
+                                      or not all(isinstance(name, str) for name in usernames)):
+            raise HTTPException(status_code=400, detail="usernames must be a list of strings")
+        return await revalidate_carts(usernames)
+
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Error re-validating carts: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def get_revalidation_stats() -> Dict:
+    """Get the summary of the last re-validation"""
+    return dict(last_run)
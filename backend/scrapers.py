@@ -0,0 +1,441 @@
+# backend/scrapers.py
+
+from typing import Callable, Dict, Iterable, List, Optional
+import logging
+import re
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Optional fast parser backends
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml  # noqa: F401
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Parser backend: "auto", "selectolax", "lxml" or "html.parser"
+PARSER_BACKEND = "auto"
+
+# What "auto" picks a backend for: "memory" or "speed". lxml with the container
+# strainer cuts both parse time and peak memory several-fold; selectolax is far
+# faster still, but lexbor builds a DOM of the whole page before the containers
+# are picked out, so its peak memory stays close to a full BeautifulSoup tree's
+PARSER_PRIORITY = "memory"
+
+# Installed backends are tried in this order by "auto"
+AUTO_BACKEND_ORDER = {
+    "memory": ["lxml", "html.parser", "selectolax"],
+    "speed": ["selectolax", "lxml", "html.parser"],
+}
+
+# Products extracted per search page unless a caller asks for fewer or more
+DEFAULT_MAX_RESULTS = 10
+
+# Simple selectors of the form tag.class1.class2[attr="value"]
+SIMPLE_SELECTOR = re.compile(r'^(\w+)?((?:\.[\w-]+)*)(?:\[([\w-]+)(?:="([^"]*)")?\])?$')
+
+def available_backends() -> List[str]:
+    """List the parser backends usable in this environment, fastest first"""
+    backends = []
+    if LexborHTMLParser is not None:
+        backends.append("selectolax")
+    if HAS_LXML:
+        backends.append("lxml")
+    backends.append("html.parser")
+    return backends
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """Pick the configured parser backend, falling back to the "auto" choice if it is not installed"""
+    backend = backend or PARSER_BACKEND
+    backends = available_backends()
+    auto = next(name for name in AUTO_BACKEND_ORDER[PARSER_PRIORITY] if name in backends)
+    if backend == "auto":
+        return auto
+    if backend not in backends:
+        logger.warning(f"Parser backend {backend} not available, using {auto}")
+        return auto
+    return backend
+
+def compile_matcher(selectors: List[str]) -> Callable[[str, Dict], bool]:
+    """Compile simple CSS selectors into a (tag name, attrs) predicate"""
+    rules = []
+    for selector in selectors:
+        match = SIMPLE_SELECTOR.match(selector)
+        if not match:
+            raise ValueError(f"Unsupported container selector: {selector}")
+        tag, classes, attr, value = match.groups()
+        rules.append((tag, set(classes.split('.')[1:]), attr, value))
+
+    def matches(name: str, attrs: Dict) -> bool:
+        attrs = attrs or {}
+        tag_classes = attrs.get('class') or ''
+        if isinstance(tag_classes, str):
+            tag_classes = tag_classes.split()
+        tag_classes = set(tag_classes)
+        for tag, classes, attr, value in rules:
+            if tag and tag != name:
+                continue
+            if not classes <= tag_classes:
+                continue
+            if attr and (attr not in attrs or (value is not None and attrs[attr] != value)):
+                continue
+            return True
+        return False
+
+    return matches
+
+class ContainerStrainer(SoupStrainer):
+    """SoupStrainer that keeps only the subtrees rooted at matching containers"""
+
+    def __init__(self, matcher: Callable[[str, Dict], bool]):
+        super().__init__()
+        self.matcher = matcher
+
+    # beautifulsoup4 >= 4.13
+    def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+        return self.matcher(name, attrs)
+
+    def allow_string_creation(self, string) -> bool:
+        return False
+
+    # beautifulsoup4 < 4.13
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        return self.matcher(markup_name, markup_attrs)
+
+class BaseScraper:
+    """Shared container lookup for the platform scrapers.
+
+    A scraper is configured by a platform adapter from the registry, which
+    carries the platform's selectors (precompiled), price rules and result
+    fields. Only the product-card containers are turned into BeautifulSoup
+    trees: with the BeautifulSoup backends a SoupStrainer drops everything
+    outside them while the page is parsed, or selectolax locates them in a
+    lexbor DOM of the whole page and each one is parsed on its own.
+    """
+
+    def __init__(self, adapter, backend: Optional[str] = None,
+                 selector_order: Optional[Dict[str, List[str]]] = None,
+                 max_results: int = DEFAULT_MAX_RESULTS):
+        self.adapter = adapter
+        self.platform = adapter.name
+        self.backend = resolve_backend(backend)
+        # Containers are only extracted until this many products are found
+        self.max_results = max_results
+        # Preferred selector order per group (e.g. "container", "name"), best first
+        self.selector_order = selector_order or {}
+        # Selector hit and miss counts per group from the last parse
+        self.selector_hits: Dict[str, Dict[str, int]] = {}
+        self.selector_misses: Dict[str, Dict[str, int]] = {}
+
+    def extract_price(self, price_text: str) -> float:
+        """Extract price value from text using the platform's price rules"""
+        return self.adapter.extract_price(price_text)
+
+    def ordered(self, group: str) -> List[str]:
+        """A group's selector cascade, preferred selectors first and unknown ones last"""
+        selectors = self.adapter.selectors.get(group, [])
+        preferred = [selector for selector in self.selector_order.get(group, []) if selector in selectors]
+        if not preferred:
+            return selectors
+        return preferred + [selector for selector in selectors if selector not in preferred]
+
+    def record_hit(self, group: str, selector: str):
+        """Count a selector that matched"""
+        group_hits = self.selector_hits.setdefault(group, {})
+        group_hits[selector] = group_hits.get(selector, 0) + 1
+
+    def record_miss(self, group: str, selector: str):
+        """Count a selector that was tried and matched nothing"""
+        group_misses = self.selector_misses.setdefault(group, {})
+        group_misses[selector] = group_misses.get(selector, 0) + 1
+
+    def select_first(self, container, group: str, selectors: List[str]):
+        """Return the first element matched by a selector cascade within a container"""
+        for selector in selectors:
+            element = self.adapter.compiled[selector].select_one(container)
+            if element:
+                logger.debug(f"Found {group} using selector: {selector}")
+                self.record_hit(group, selector)
+                return element
+            self.record_miss(group, selector)
+        return None
+
+    def find_containers(self, html: str) -> Iterable:
+        """Return the containers matched by the first selector that hits"""
+        selectors = self.ordered("container")
+        if self.backend == "selectolax":
+            return self._find_containers_selectolax(html, selectors)
+
+        strainer = ContainerStrainer(self.adapter.container_matcher)
+        soup = BeautifulSoup(html, self.backend, parse_only=strainer)
+        for selector in selectors:
+            containers = self.adapter.compiled[selector].select(soup)
+            if containers:
+                logger.info(f"Found {len(containers)} products using selector: {selector}")
+                logger.debug(f"First container HTML: {containers[0]}")
+                self.record_hit("container", selector)
+                return containers
+            self.record_miss("container", selector)
+        return []
+
+    def _find_containers_selectolax(self, html: str, selectors: List[str]) -> Iterable:
+        tree = LexborHTMLParser(html)
+        for selector in selectors:
+            nodes = tree.css(selector)
+            if nodes:
+                logger.info(f"Found {len(nodes)} products using selector: {selector}")
+                self.record_hit("container", selector)
+                # Parse each container separately so nested matches keep their own
+                # subtree, and lazily so containers past the last needed one are skipped
+                return (BeautifulSoup(node.html, 'html.parser').find(True) for node in nodes)
+            self.record_miss("container", selector)
+        return []
+
+class FlipkartScraper(BaseScraper):
+    """Simplified Flipkart scraper based on SmartShop's implementation"""
+
+    def parse_search_results(self, html: str) -> List[Dict]:
+        """Parse Flipkart search results"""
+        products = []
+        product_containers = self.find_containers(html)
+
+        for idx, container in enumerate(product_containers):
+            if len(products) >= self.max_results:
+                break
+            try:
+                logger.debug(f"Processing product container {idx + 1}")
+                
+                # Try to find any link first - most product info is in links
+                links = container.find_all('a')
+                if not links:
+                    logger.debug(f"No links found in container {idx + 1}")
+                    continue
+
+                # Try to find product name from link title or text
+                name = None
+                for link in links:
+                    if link.get('title'):
+                        name = link.get('title')
+                        break
+                    elif link.get_text(strip=True):
+                        name = link.get_text(strip=True)
+                        break
+
+                if not name:
+                    logger.debug(f"No name found in container {idx + 1}")
+                    continue
+
+                logger.debug(f"Found product name: {name}")
+
+                # Try to find price - look for ₹ symbol
+                price_text = None
+                price_candidates = container.find_all(text=lambda t: '₹' in str(t))
+                if price_candidates:
+                    price_text = price_candidates[0]
+                    logger.debug(f"Found price text: {price_text}")
+
+                if not price_text:
+                    logger.debug(f"No price found in container {idx + 1}")
+                    continue
+
+                price = self.extract_price(price_text)
+                if price == 0:
+                    logger.debug(f"Invalid price (0) for container {idx + 1}")
+                    continue
+
+                # Get product URL from the first link
+                url = self.adapter.base_url + links[0].get('href', '')
+
+                # Try to find image - look for any img tag
+                image_url = None
+                img_tag = container.find('img')
+                if img_tag:
+                    image_url = img_tag.get('src')
+
+                products.append({
+                    "product": name,
+                    "price": price,
+                    "platform": self.adapter.display_name,
+                    "delivery": self.adapter.delivery,
+                    "url": url,
+                    "image_url": image_url
+                })
+                logger.info(f"Successfully parsed product: {name} from Flipkart")
+
+            except Exception as e:
+                logger.error(f"Error parsing Flipkart product container {idx + 1}: {str(e)}")
+                logger.debug(f"Problematic container HTML: {container}")
+                continue
+
+        return products
+
+class AmazonScraper(BaseScraper):
+    """Simplified Amazon scraper"""
+
+    def parse_search_results(self, html: str) -> List[Dict]:
+        """Parse Amazon search results"""
+        products = []
+        product_containers = self.find_containers(html)
+
+        for idx, container in enumerate(product_containers):
+            if len(products) >= self.max_results:
+                break
+            try:
+                logger.debug(f"Processing Amazon product container {idx + 1}")
+
+                # Skip sponsored products
+                if container.get('data-component-type') == "sp-sponsored-result":
+                    logger.debug("Skipping sponsored product")
+                    continue
+
+                # Try to find product name from h2 tags first
+                name = None
+                h2_tag = container.find('h2')
+                if h2_tag:
+                    name = h2_tag.get_text(strip=True)
+                
+                if not name:
+                    # Try finding any span with product text
+                    spans = container.find_all('span', class_=lambda x: x and ('a-text-normal' in x or 'a-color-base' in x))
+                    for span in spans:
+                        if span.get_text(strip=True):
+                            name = span.get_text(strip=True)
+                            break
+
+                if not name:
+                    logger.debug(f"No name found in container {idx + 1}")
+                    continue
+
+                logger.debug(f"Found product name: {name}")
+
+                # Try to find price - look for ₹ symbol first
+                price_text = None
+                price_candidates = container.find_all(text=lambda t: '₹' in str(t))
+                if price_candidates:
+                    price_text = price_candidates[0]
+                    logger.debug(f"Found price text: {price_text}")
+
+                if not price_text:
+                    # Try finding price in span tags
+                    price_spans = container.find_all('span', class_=lambda x: x and ('a-price' in x or 'a-color-price' in x))
+                    for span in price_spans:
+                        if '₹' in span.get_text():
+                            price_text = span.get_text()
+                            break
+
+                if not price_text:
+                    logger.debug(f"No price found in container {idx + 1}")
+                    continue
+
+                price = self.extract_price(price_text)
+                if price == 0:
+                    logger.debug(f"Invalid price (0) for container {idx + 1}")
+                    continue
+
+                # Get product URL
+                url_tag = container.find('a', class_=lambda x: x and ('a-link-normal' in x))
+                if not url_tag:
+                    url_tag = container.find('a')
+                
+                if not url_tag:
+                    logger.debug(f"No URL found in container {idx + 1}")
+                    continue
+
+                url = self.adapter.base_url + url_tag.get('href', '')
+
+                # Try to find image
+                image_url = None
+                img_tag = container.find('img')
+                if img_tag:
+                    image_url = img_tag.get('src')
+
+                products.append({
+                    "product": name,
+                    "price": price,
+                    "platform": self.adapter.display_name,
+                    "delivery": self.adapter.delivery,
+                    "url": url,
+                    "image_url": image_url
+                })
+                logger.info(f"Successfully parsed product: {name} from Amazon")
+
+            except Exception as e:
+                logger.error(f"Error parsing Amazon product container {idx + 1}: {str(e)}")
+                logger.debug(f"Problematic container HTML: {container}")
+                continue
+
+        return products
+
+class MeeshoScraper(BaseScraper):
+    """Simplified Meesho scraper"""
+
+    def parse_search_results(self, html: str) -> List[Dict]:
+        """Parse Meesho search results"""
+        products = []
+        product_containers = self.find_containers(html)
+
+        # Field cascades, best performing selectors first
+        name_selectors = self.ordered("name")
+        price_selectors = self.ordered("price")
+        url_selectors = self.ordered("url")
+        img_selectors = self.ordered("image")
+
+        for container in product_containers:
+            if len(products) >= self.max_results:
+                break
+            try:
+                # Extract product name - try multiple selectors
+                name_element = self.select_first(container, "name", name_selectors)
+                if not name_element:
+                    logger.debug("No name element found, skipping product")
+                    continue
+                name = name_element.get_text(strip=True)
+
+                # Extract price - try multiple selectors
+                price_element = self.select_first(container, "price", price_selectors)
+                if not price_element:
+                    logger.debug("No price element found, skipping product")
+                    continue
+                price = self.extract_price(price_element.get_text(strip=True))
+
+                # Extract product URL - try multiple selectors
+                url_element = self.select_first(container, "url", url_selectors)
+                if not url_element:
+                    logger.debug("No URL element found, skipping product")
+                    continue
+                url = self.adapter.base_url + url_element.get('href', '')
+
+                # Extract image URL - try multiple selectors
+                img_element = self.select_first(container, "image", img_selectors)
+                image_url = img_element.get('src') if img_element else None
+
+                products.append({
+                    "product": name,
+                    "price": price,
+                    "platform": self.adapter.display_name,
+                    "delivery": self.adapter.delivery,
+                    "url": url,
+                    "image_url": image_url
+                })
+                logger.info(f"Successfully parsed product: {name} from Meesho")
+
+            except Exception as e:
+                logger.error(f"Error parsing Meesho product container: {str(e)}")
+                continue
+
+        return products
+
+# Parser implementations a platform adapter can name in platforms.json
+SCRAPER_TYPES = {
+    "flipkart": FlipkartScraper,
+    "amazon": AmazonScraper,
+    "meesho": MeeshoScraper
+}
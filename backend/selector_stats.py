@@ -0,0 +1,133 @@
+# backend/selector_stats.py
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+from pymongo import UpdateOne
+from db import get_database
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# How often hit counts are written back to MongoDB, in seconds
+SELECTOR_STATS_FLUSH_INTERVAL = 60
+
+# Selector ordering settings
+SELECTOR_HALF_LIFE = 3600            # Seconds over which recent hits and misses lose half their weight
+SELECTOR_MIN_ATTEMPTS = 5.0          # Recent tries needed before a selector's hit rate is trusted
+SELECTOR_DEMOTE_RATE = 0.5           # Selectors hitting less often than this are tried after the rest
+
+class SelectorStats:
+    """Per-platform selector hit rates used to order selector cascades.
+
+    Cascades keep the adapter's declared order, most specific selector
+    first. A selector is only moved behind the others once it has missed
+    in most of its recent tries, so a broad fallback that hits now and
+    then never displaces a selector that usually matches. Recent counts
+    decay, so a demoted selector is tried first again after a while.
+    """
+
+    def __init__(self):
+        # (platform, group, selector) -> {"hits", "last_hit", "recent_hits", "recent_misses", "updated"}
+        self._stats: Dict[Tuple[str, str, str], Dict] = {}
+        self._dirty = set()
+
+    def _entry(self, key: Tuple[str, str, str], now: float) -> Dict:
+        """A selector's stats with the recent counts decayed to now"""
+        entry = self._stats.setdefault(key, {
+            "hits": 0, "last_hit": 0.0, "recent_hits": 0.0, "recent_misses": 0.0, "updated": now
+        })
+        decay = 0.5 ** (max(0.0, now - entry["updated"]) / SELECTOR_HALF_LIFE)
+        entry["recent_hits"] *= decay
+        entry["recent_misses"] *= decay
+        entry["updated"] = now
+        return entry
+
+    def record(self, platform: str, selector_hits: Dict[str, Dict[str, int]],
+               selector_misses: Optional[Dict[str, Dict[str, int]]] = None):
+        """Add the hits and misses reported by one parse"""
+        now = time.time()
+        for group, hits in selector_hits.items():
+            for selector, count in hits.items():
+                key = (platform, group, selector)
+                entry = self._entry(key, now)
+                entry["hits"] += count
+                entry["recent_hits"] += count
+                entry["last_hit"] = now
+                self._dirty.add(key)
+        for group, misses in (selector_misses or {}).items():
+            for selector, count in misses.items():
+                key = (platform, group, selector)
+                self._entry(key, now)["recent_misses"] += count
+                self._dirty.add(key)
+
+    def is_demoted(self, platform: str, group: str, selector: str, now: Optional[float] = None) -> bool:
+        """Whether a selector has recently missed too often to be tried first"""
+        key = (platform, group, selector)
+        if key not in self._stats:
+            return False
+        entry = self._entry(key, now or time.time())
+        attempts = entry["recent_hits"] + entry["recent_misses"]
+        return attempts >= SELECTOR_MIN_ATTEMPTS and entry["recent_hits"] / attempts < SELECTOR_DEMOTE_RATE
+
+    def preferred_order(self, platform: str, declared: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        """Each group's declared selectors, with the ones that recently kept missing moved last"""
+        now = time.time()
+        order = {}
+        for group, selectors in declared.items():
+            demoted = [selector for selector in selectors if self.is_demoted(platform, group, selector, now)]
+            if demoted:
+                order[group] = [selector for selector in selectors if selector not in demoted] + demoted
+        return order
+
+    def snapshot(self) -> Dict:
+        """Get all stats grouped by platform and selector group"""
+        result: Dict[str, Dict[str, Dict[str, Dict]]] = {}
+        for (platform, group, selector), entry in self._stats.items():
+            result.setdefault(platform, {}).setdefault(group, {})[selector] = dict(entry)
+        return result
+
+    async def load(self):
+        """Load persisted stats from MongoDB"""
+        db = await get_database()
+        async for doc in db.selector_stats.find({}):
+            key = (doc["platform"], doc["group"], doc["selector"])
+            self._stats[key] = {
+                "hits": doc.get("hits", 0),
+                "last_hit": doc.get("last_hit", 0.0),
+                "recent_hits": doc.get("recent_hits", 0.0),
+                "recent_misses": doc.get("recent_misses", 0.0),
+                "updated": doc.get("updated", doc.get("last_hit", 0.0)),
+            }
+        logger.info(f"Loaded {len(self._stats)} selector stats")
+
+    async def flush(self):
+        """Write changed stats back to MongoDB"""
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        operations = [
+            UpdateOne(
+                {"platform": platform, "group": group, "selector": selector},
+                {"$set": self._stats[(platform, group, selector)]},
+                upsert=True
+            )
+            for platform, group, selector in dirty
+        ]
+        try:
+            db = await get_database()
+            await db.selector_stats.bulk_write(operations, ordered=False)
+            logger.debug(f"Flushed {len(operations)} selector stats")
+        except Exception as e:
+            logger.error(f"Failed to flush selector stats: {str(e)}")
+            self._dirty |= dirty
+
+selector_stats = SelectorStats()
+
+async def selector_stats_flush_loop():
+    """Periodically persist selector stats"""
+    while True:
+        await asyncio.sleep(SELECTOR_STATS_FLUSH_INTERVAL)
+        await selector_stats.flush()
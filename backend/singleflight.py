@@ -0,0 +1,50 @@
+# backend/singleflight.py
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one in-flight call.
+
+    The first caller for a key starts the work as a task; callers arriving
+    while it runs await the same task. Each caller awaits through
+    ``asyncio.shield`` so one caller giving up does not cancel the work for
+    the others.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn() for key, or join the call already in flight for it"""
+        task = self._calls.get(key)
+        if task is not None:
+            self.coalesced += 1
+            logger.debug(f"Joining in-flight call for {key}")
+            return await asyncio.shield(task)
+
+        task = asyncio.get_running_loop().create_task(fn())
+        self._calls[key] = task
+        self.executed += 1
+
+        def _forget(done: asyncio.Task):
+            if self._calls.get(key) is done:
+                del self._calls[key]
+
+        task.add_done_callback(_forget)
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict:
+        """Get coalescing counters"""
+        return {
+            "in_flight": len(self._calls),
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,158 @@
+# backend/suggest.py
+
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+from fastapi import APIRouter
+from db import get_database
+from mockdata import MOCK_DATA
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Create router
+router = APIRouter(tags=["suggest"])
+
+# Suggestion settings
+SUGGEST_TOP_K = 10               # Suggestions cached per trie node, and the most /suggest returns
+SUGGEST_DEFAULT_LIMIT = 5
+SUGGEST_QUERY_WEIGHT = 2         # Weight added each time a query is searched
+SUGGEST_PRODUCT_WEIGHT = 1       # Weight of a product name when first seen
+SUGGEST_MAX_KEYS = 200_000       # Product names stop being added past this many entries
+SUGGEST_SEED_LIMIT = 50_000      # Catalog product names loaded at startup
+
+class TrieNode:
+    __slots__ = ("children", "weight", "top")
+
+    def __init__(self):
+        # first character of the edge -> (edge label, child node)
+        self.children: Dict[str, Tuple[str, "TrieNode"]] = {}
+        # Weight of the key ending here, 0 if none does
+        self.weight = 0
+        # Heaviest (weight, key) pairs in this subtree, heaviest first
+        self.top: List[Tuple[int, str]] = []
+
+class SuggestionTrie:
+    """Compressed prefix trie with the top-k completions cached on every node.
+
+    Weights only grow, so an insert can keep the caches exact by updating
+    just the nodes on the key's path, and a lookup is a walk down the
+    prefix followed by reading one cached list.
+    """
+
+    def __init__(self, top_k: int = SUGGEST_TOP_K):
+        self.top_k = top_k
+        self.root = TrieNode()
+        self.keys = 0
+
+    def _update_top(self, node: TrieNode, key: str, weight: int):
+        top = [entry for entry in node.top if entry[1] != key]
+        top.append((weight, key))
+        top.sort(key=lambda entry: (-entry[0], entry[1]))
+        node.top = top[:self.top_k]
+
+    def add(self, key: str, weight: int = 1) -> int:
+        """Add weight to a key, inserting it if new; returns the key's weight"""
+        path = [self.root]
+        node = self.root
+        rest = key
+        while rest:
+            edge = node.children.get(rest[0])
+            if edge is None:
+                child = TrieNode()
+                node.children[rest[0]] = (rest, child)
+                node = child
+                rest = ""
+            else:
+                label, child = edge
+                common = 0
+                while common < min(len(label), len(rest)) and label[common] == rest[common]:
+                    common += 1
+                if common < len(label):
+                    # Split the edge where the key leaves it
+                    middle = TrieNode()
+                    middle.top = list(child.top)
+                    middle.children[label[common]] = (label[common:], child)
+                    node.children[rest[0]] = (label[:common], middle)
+                    child = middle
+                node = child
+                rest = rest[common:]
+            path.append(node)
+
+        if node.weight == 0:
+            self.keys += 1
+        node.weight += weight
+        for step in path:
+            self._update_top(step, key, node.weight)
+        return node.weight
+
+    def contains(self, key: str) -> bool:
+        node = self._find(key, exact=True)
+        return node is not None and node.weight > 0
+
+    def _find(self, prefix: str, exact: bool = False) -> Optional[TrieNode]:
+        node = self.root
+        rest = prefix
+        while rest:
+            edge = node.children.get(rest[0])
+            if edge is None:
+                return None
+            label, child = edge
+            if rest.startswith(label):
+                rest = rest[len(label):]
+            elif label.startswith(rest) and not exact:
+                rest = ""
+            else:
+                return None
+            node = child
+        return node
+
+    def suggest(self, prefix: str, limit: int = SUGGEST_DEFAULT_LIMIT) -> List[str]:
+        """Heaviest keys starting with the prefix"""
+        node = self._find(prefix)
+        if node is None:
+            return []
+        return [key for _, key in node.top[:limit]]
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.lower().split())
+
+query_suggestions = SuggestionTrie()
+
+def record_query(query_text: str):
+    """Count a search that returned results"""
+    query = normalize_text(query_text)
+    if query:
+        query_suggestions.add(query, SUGGEST_QUERY_WEIGHT)
+
+def record_products(names: List[str]):
+    """Add product names not seen before"""
+    for name in names:
+        if query_suggestions.keys >= SUGGEST_MAX_KEYS:
+            return
+        key = normalize_text(name)
+        if key and not query_suggestions.contains(key):
+            query_suggestions.add(key, SUGGEST_PRODUCT_WEIGHT)
+
+async def load_suggestions():
+    """Seed the trie with mock catalog names and recently seen catalog products"""
+    record_products([item["product"] for item in MOCK_DATA])
+    try:
+        db = await get_database()
+        cursor = db.products.find({}, {"_id": 0, "product": 1}).sort("last_seen", -1).limit(SUGGEST_SEED_LIMIT)
+        record_products([doc["product"] async for doc in cursor])
+    except Exception as e:
+        logger.error(f"Failed to load catalog names for suggestions: {str(e)}")
+    logger.info(f"Loaded {query_suggestions.keys} suggestions")
+
+@router.get("/suggest")
+async def suggest(q: str, limit: int = SUGGEST_DEFAULT_LIMIT):
+    """Suggest completions for a partly typed query"""
+    start = time.perf_counter()
+    suggestions = query_suggestions.suggest(normalize_text(q), max(1, min(limit, SUGGEST_TOP_K)))
+    return {
+        "query": q,
+        "suggestions": suggestions,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 3)
+    }
@@ -0,0 +1,52 @@
+# backend/units.py
+
+import re
+from typing import Optional, Tuple
+
+# Unit spellings -> (base unit, multiplier to the base unit)
+UNIT_ALIASES = {
+    "g": ("g", 1.0), "gm": ("g", 1.0), "gms": ("g", 1.0), "gram": ("g", 1.0), "grams": ("g", 1.0),
+    "kg": ("g", 1000.0), "kgs": ("g", 1000.0), "kilo": ("g", 1000.0), "kilogram": ("g", 1000.0),
+    "ml": ("ml", 1.0), "milliliter": ("ml", 1.0), "millilitre": ("ml", 1.0),
+    "milliliters": ("ml", 1.0), "millilitres": ("ml", 1.0),
+    "l": ("ml", 1000.0), "ltr": ("ml", 1000.0), "litre": ("ml", 1000.0), "liter": ("ml", 1000.0),
+    "litres": ("ml", 1000.0), "liters": ("ml", 1000.0),
+    "pc": ("pcs", 1.0), "pcs": ("pcs", 1.0), "piece": ("pcs", 1.0), "pieces": ("pcs", 1.0),
+}
+
+# Longest spellings first so "kg" is not read as "k" + "g"
+QUANTITY_PATTERN = re.compile(
+    r"(\d+(?:\.\d+)?)\s*(" + "|".join(sorted(UNIT_ALIASES, key=len, reverse=True)) + r")\b"
+)
+PACK_PATTERN = re.compile(r"\b(?:pack|set) of (\d+)\b")
+
+def extract_quantity(text: str) -> Optional[Tuple[float, str]]:
+    """Find the first quantity in a product title as (amount in base unit, base unit).
+
+    Pack sizes multiply the quantity, so "Butter 100g (Pack of 2)" is 200 g.
+    """
+    text = text.lower()
+    match = QUANTITY_PATTERN.search(text)
+    pack = PACK_PATTERN.search(text)
+    count = int(pack.group(1)) if pack else 1
+    if match:
+        unit, factor = UNIT_ALIASES[match.group(2)]
+        return float(match.group(1)) * factor * count, unit
+    if pack:
+        return float(count), "pcs"
+    return None
+
+def strip_quantities(text: str) -> str:
+    """Remove quantity and pack-size expressions from a title"""
+    return PACK_PATTERN.sub(" ", QUANTITY_PATTERN.sub(" ", text.lower()))
+
+def format_quantity(quantity: Optional[Tuple[float, str]]) -> Optional[str]:
+    """Readable form of an extracted quantity, e.g. "1 kg" or "500 ml" """
+    if quantity is None:
+        return None
+    amount, unit = quantity
+    if unit == "g" and amount >= 1000:
+        amount, unit = amount / 1000, "kg"
+    elif unit == "ml" and amount >= 1000:
+        amount, unit = amount / 1000, "l"
+    return f"{amount:g} {unit}"
@@ -0,0 +1,147 @@
+# benchmarks/bench_mock_search.py
+
+"""Benchmark for the mockdata search index on a large synthetic catalog.
+
+Builds a catalog of ``--items`` products whose names mix the fixture
+brands and items with ``--vocabulary`` generated words and pack sizes in
+every unit spelling, so the index sees a vocabulary the size of a real
+catalog's. It times building the index, resolving terms the first time
+they are seen (cold) and again from the term cache (warm), and checks a
+sample of queries against a straightforward scan that applies the same
+term-matching rules.
+
+    python benchmarks/bench_mock_search.py --items 1000000 --vocabulary 200000
+"""
+
+import argparse
+import random
+import string
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "backend"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixtures import BRANDS, ITEMS, PACKS  # noqa: E402
+from mockdata import UNIT_REWRITES, MockSearchIndex  # noqa: E402
+
+QUERIES = ["amul", "milk 500ml", "butter 500gm", "tata salt 1kg", "gold", "ghee 1l", "cheese slices", "oil 500 gram"]
+
+# Pack amounts and unit spellings combined into pack-size tokens
+AMOUNTS = [50, 100, 150, 200, 250, 400, 500, 750, 900, 1000]
+UNITS = ["g", "gm", "gms", "gram", "grams", "ml", "milliliter", "millilitre", "kg", "l", "ltr"]
+
+def synthetic_words(count: int, rng: random.Random) -> List[str]:
+    """Distinct made-up words standing in for brand, variety and flavour names"""
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10))))
+    return sorted(words)
+
+def synthetic_catalog(count: int, vocabulary: int = 200_000, seed: int = 0) -> List[Dict]:
+    """Random products built from the fixtures, generated words and pack sizes"""
+    rng = random.Random(seed)
+    words = synthetic_words(vocabulary, rng)
+    items = []
+    for _ in range(count):
+        brand = rng.choice(BRANDS) if rng.random() < 0.3 else rng.choice(words).title()
+        pack = rng.choice(PACKS) if rng.random() < 0.3 else f"{rng.choice(AMOUNTS)}{rng.choice(UNITS)}"
+        items.append({
+            "product": f"{brand} {rng.choice(words).title()} {rng.choice(ITEMS)} {pack}",
+            "price": float(rng.randint(20, 2500)),
+            "platform": rng.choice(["BigBasket", "Grofers"]),
+            "delivery": rng.choice([30, 45]),
+        })
+    return items
+
+def sample_terms(index: MockSearchIndex, count: int, rng: random.Random) -> List[str]:
+    """Distinct terms as users type them: whole tokens, prefixes and pack sizes in other spellings"""
+    terms = set()
+    while len(terms) < count:
+        token = rng.choice(index.tokens)
+        kind = rng.random()
+        if kind < 0.4:
+            terms.add(token)
+        elif kind < 0.8:
+            terms.add(token[:rng.randint(3, max(3, len(token)))])
+        else:
+            terms.add(f"{rng.choice(AMOUNTS)}{rng.choice(UNITS)}")
+    return sorted(terms)
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def scan(items: List[Dict], query: str) -> List[Dict]:
+    """Reference search: check every term against every product"""
+    def term_matches(term: str, text: str) -> bool:
+        if term in text:
+            return True
+        return any(
+            variant in term and term.replace(variant, unit) in text.replace(variant, unit)
+            for variant, unit in UNIT_REWRITES
+        )
+
+    terms = query.lower().split()
+    return [item for item in items if all(term_matches(term, item["product"].lower()) for term in terms)]
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the mock catalog search index")
+    parser.add_argument("--items", type=int, default=1_000_000, help="synthetic catalog size")
+    parser.add_argument("--vocabulary", type=int, default=200_000, help="generated words to draw names from")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per query")
+    parser.add_argument("--terms", type=int, default=2000, help="distinct terms timed for cold lookups")
+    parser.add_argument("--check", type=int, default=20_000, help="catalog size used for the correctness check")
+    args = parser.parse_args()
+
+    items = synthetic_catalog(args.items, args.vocabulary)
+    start = time.perf_counter()
+    index = MockSearchIndex(items)
+    print(f"Indexed {len(items)} items ({len(index.tokens)} distinct tokens) in {time.perf_counter() - start:.2f}s")
+
+    # A throwaway lookup keeps numpy's one-off setup out of the first timing
+    index._term_tokens(QUERIES[1].split()[-1])
+
+    # Cold: every term resolved against the vocabulary; warm: served from the term cache
+    print(f"\n{'query':<16} {'cold ms':>10} {'warm ms':>10} {'matches':>9}")
+    for query in QUERIES:
+        index._term_cache.clear()
+        start = time.perf_counter()
+        results = index.search(query)
+        cold = time.perf_counter() - start
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            index.search(query)
+            timings.append(time.perf_counter() - start)
+        print(f"{query:<16} {cold * 1000:>10.2f} {statistics.median(timings) * 1000:>10.2f} {len(results):>9}")
+
+    rng = random.Random(1)
+    terms = sample_terms(index, args.terms, rng)
+    index._term_cache.clear()
+    for label in ("cold", "warm"):
+        timings = []
+        for term in terms:
+            start = time.perf_counter()
+            index.match_term(term)
+            timings.append(time.perf_counter() - start)
+        print(f"\n{label} term lookups ({len(terms)} distinct terms): "
+              f"median {statistics.median(timings) * 1000:.3f}ms, "
+              f"p99 {percentile(timings, 0.99) * 1000:.3f}ms, max {max(timings) * 1000:.3f}ms", end="")
+    print()
+
+    sample = items[:args.check]
+    sample_index = MockSearchIndex(sample)
+    queries = QUERIES + [f"{term} {other}" for term, other in zip(terms[:20], reversed(terms[-20:]))] + terms[:40]
+    mismatches = [query for query in queries if sample_index.search(query) != scan(sample, query)]
+    print(f"\nChecked {len(queries)} queries against a scan of {len(sample)} items: {len(mismatches)} mismatch(es)")
+    for query in mismatches:
+        print(f"  {query}")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+# benchmarks/bench_parsers.py
+
+"""Offline benchmark for the platform scrapers' parse_search_results.
+
+Runs every fixture through its platform's scraper with each available
+parser backend and reports parse time, memory allocated and products
+extracted, checking the products against the fixture's expected output.
+Each backend is also compared with building a full ``html.parser``
+BeautifulSoup tree of the page, as the scrapers did before parsing was
+restricted to the product containers.
+Results are saved under ``results/`` and compared with the previous run
+(or ``--baseline``) so regressions show up between versions.
+
+    python benchmarks/bench_parsers.py --repeat 5
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from bs4 import BeautifulSoup
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "backend"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixtures import load_corpus  # noqa: E402
+from registry import get_adapter  # noqa: E402
+from scrapers import available_backends, resolve_backend  # noqa: E402
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+def version_label() -> str:
+    """Project version plus the current git commit, if available"""
+    version = "unknown"
+    for line in (ROOT / "pyproject.toml").read_text().splitlines():
+        if line.startswith("version"):
+            version = line.split("=", 1)[1].strip().strip('"')
+            break
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        return f"{version}-{commit}"
+    except (OSError, subprocess.CalledProcessError):
+        return version
+
+def bench_fixture(fixture: Dict, backend: str, repeat: int) -> Dict:
+    """Time one fixture with one backend and measure its allocations"""
+    adapter = get_adapter(fixture["platform"])
+    html = fixture["html"]
+
+    timings = []
+    products: List[Dict] = []
+    for _ in range(repeat):
+        scraper = adapter.create_scraper(backend=backend)
+        start = time.perf_counter()
+        products = scraper.parse_search_results(html)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    scraper = adapter.create_scraper(backend=backend)
+    scraper.parse_search_results(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    expected = fixture["expected"]
+    return {
+        "platform": fixture["platform"],
+        "fixture": fixture["name"],
+        "backend": backend,
+        "page_kb": round(len(html.encode("utf-8")) / 1024, 1),
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "min_ms": round(min(timings) * 1000, 3),
+        "peak_alloc_kb": round(peak / 1024, 1),
+        "products": len(products),
+        "correct": None if expected is None else products == expected,
+    }
+
+def bench_full_tree(fixture: Dict, repeat: int) -> Dict:
+    """Time and measure a whole-page html.parser tree, the cost parsing used to have"""
+    html = fixture["html"]
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        BeautifulSoup(html, "html.parser")
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    BeautifulSoup(html, "html.parser")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"median_ms": statistics.median(timings) * 1000, "peak_alloc_kb": peak / 1024}
+
+def print_reductions(results: List[Dict], full_trees: Dict[str, Dict]):
+    """Median speed-up and peak memory reduction per backend against a full tree"""
+    print(f"\nAgainst a full html.parser tree (median over fixtures; auto picks {resolve_backend('auto')}):")
+    for backend in dict.fromkeys(row["backend"] for row in results):
+        rows = [row for row in results if row["backend"] == backend]
+        speedup = statistics.median(full_trees[row["fixture"]]["median_ms"] / row["median_ms"] for row in rows)
+        memory = statistics.median(full_trees[row["fixture"]]["peak_alloc_kb"] / row["peak_alloc_kb"] for row in rows)
+        print(f"  {backend:<12} {speedup:>5.1f}x faster, {memory:>5.1f}x less peak memory")
+
+def find_baseline(label: str) -> Optional[Path]:
+    """The most recent stored run other than this one"""
+    runs = sorted(
+        (path for path in RESULTS_DIR.glob("*.json") if path.stem != label),
+        key=lambda path: path.stat().st_mtime
+    )
+    return runs[-1] if runs else None
+
+def compare(results: List[Dict], baseline: Dict, threshold: float) -> List[str]:
+    """List cases that got slower or lost products compared with the baseline"""
+    previous = {(row["fixture"], row["backend"]): row for row in baseline["results"]}
+    regressions = []
+    for row in results:
+        old = previous.get((row["fixture"], row["backend"]))
+        if old is None:
+            continue
+        if old["median_ms"] and row["median_ms"] > old["median_ms"] * (1 + threshold):
+            regressions.append(
+                f"{row['fixture']} [{row['backend']}]: {old['median_ms']}ms -> {row['median_ms']}ms"
+            )
+        if row["products"] < old["products"] or (old.get("correct") and row["correct"] is False):
+            regressions.append(
+                f"{row['fixture']} [{row['backend']}]: products {old['products']} -> {row['products']}, "
+                f"correct={row['correct']}"
+            )
+    return regressions
+
+def print_table(results: List[Dict]):
+    header = f"{'fixture':<38} {'backend':<12} {'KB':>8} {'median ms':>10} {'peak KB':>9} {'n':>3} {'ok':>5}"
+    print(header)
+    print("-" * len(header))
+    for row in results:
+        print(
+            f"{row['fixture']:<38} {row['backend']:<12} {row['page_kb']:>8} {row['median_ms']:>10} "
+            f"{row['peak_alloc_kb']:>9} {row['products']:>3} {str(row['correct']):>5}"
+        )
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark scraper parsing against the fixture corpus")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per fixture and backend")
+    parser.add_argument("--backend", action="append", help="backend(s) to run (default: all available)")
+    parser.add_argument("--platform", action="append", help="platform(s) to run (default: all)")
+    parser.add_argument("--label", default=None, help="name for the stored results (default: version-commit)")
+    parser.add_argument("--baseline", type=Path, default=None, help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="slowdown ratio reported as a regression")
+    parser.add_argument("--no-save", action="store_true", help="don't store the results")
+    args = parser.parse_args()
+
+    # Scrapers log every product at INFO; keep the benchmark output readable
+    logging.disable(logging.INFO)
+
+    backends = args.backend or available_backends()
+    fixtures = [
+        fixture for fixture in load_corpus()
+        if not args.platform or fixture["platform"] in args.platform
+    ]
+
+    results = [bench_fixture(fixture, backend, args.repeat) for fixture in fixtures for backend in backends]
+    print_table(results)
+    print_reductions(results, {fixture["name"]: bench_full_tree(fixture, args.repeat) for fixture in fixtures})
+
+    label = args.label or version_label()
+    baseline_path = args.baseline or find_baseline(label)
+    failures = [row for row in results if row["correct"] is False]
+
+    if not args.no_save:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        out = RESULTS_DIR / f"{label}.json"
+        out.write_text(json.dumps({
+            "label": label,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "results": results,
+        }, indent=2))
+        print(f"\nSaved results to {out}")
+
+    if failures:
+        print(f"\n{len(failures)} fixture runs returned unexpected products")
+
+    if baseline_path and baseline_path.exists():
+        regressions = compare(results, json.loads(baseline_path.read_text()), args.threshold)
+        print(f"\nCompared with {baseline_path.name}: {len(regressions)} regression(s)")
+        for line in regressions:
+            print(f"  {line}")
+        if regressions:
+            return 1
+
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
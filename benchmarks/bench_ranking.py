@@ -0,0 +1,75 @@
+# benchmarks/bench_ranking.py
+
+"""Benchmark for scoring and ranking a large set of search results.
+
+Builds ``--items`` synthetic results from the fixture vocabulary, with
+pack sizes in titles, and times rank_products for the default weights
+and for a delivery-heavy weighting, once with cold title caches and then
+warm. Runs build one page of ``--limit`` results, as /query does, and the
+full ranking is timed once at the end.
+
+    python benchmarks/bench_ranking.py --items 5000
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "backend"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixtures import BRANDS, ITEMS, PACKS  # noqa: E402
+from matching import title_features  # noqa: E402
+from ranking import DEFAULT_WEIGHTS, rank_products  # noqa: E402
+
+WEIGHTINGS = {
+    "default": DEFAULT_WEIGHTS,
+    "delivery": {"price": 0.5, "unit_price": 0.5, "delivery": 2.0},
+}
+
+def synthetic_results(count: int, seed: int = 0) -> List[Dict]:
+    """Random results built from the fixture brands, items and pack sizes"""
+    rng = random.Random(seed)
+    return [
+        {
+            "product": f"{rng.choice(BRANDS)} {rng.choice(ITEMS)} {rng.choice(PACKS)}",
+            "price": float(rng.randint(20, 2500)),
+            "platform": rng.choice(["Flipkart", "Amazon", "Meesho"]),
+            "delivery": rng.choice([30, 45, 60, 1440, 2880]),
+        }
+        for _ in range(count)
+    ]
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark result ranking")
+    parser.add_argument("--items", type=int, default=5000, help="results ranked per run")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per weighting")
+    parser.add_argument("--limit", type=int, default=30, help="results built per page")
+    args = parser.parse_args()
+
+    results = synthetic_results(args.items)
+    print(f"{'weights':<10} {'cold ms':>10} {'median ms':>10}")
+    for name, weights in WEIGHTINGS.items():
+        title_features.cache_clear()
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            ranked = rank_products(results, weights, limit=args.limit)
+            timings.append(time.perf_counter() - start)
+        print(f"{name:<10} {timings[0] * 1000:>10.2f} {statistics.median(timings) * 1000:>10.2f}")
+
+    start = time.perf_counter()
+    rank_products(results, DEFAULT_WEIGHTS)
+    print(f"{'full':<10} {'':>10} {(time.perf_counter() - start) * 1000:>10.2f}")
+
+    top = ranked[0]
+    print(f"\nTop result: {top['product']} at {top['price']} ({top['unit_price']} per {top['unit']}), score {top['score']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
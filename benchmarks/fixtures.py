@@ -0,0 +1,202 @@
+# benchmarks/fixtures.py
+
+"""Fixture corpus of search-result pages for offline parser benchmarks.
+
+Generated pages are deterministic and cover every platform in several
+sizes and in each container layout the scrapers know about. Each page is
+written with a ``.expected.json`` file holding the products the scraper
+should extract. Real pages saved from the sites can be dropped into
+``fixtures/recorded/`` as ``<platform>__<name>.html`` (optionally with a
+matching ``.expected.json``) and are picked up the same way.
+"""
+
+import argparse
+import json
+import random
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+GENERATED_DIR = FIXTURES_DIR / "generated"
+RECORDED_DIR = FIXTURES_DIR / "recorded"
+
+# Results the scrapers keep per page
+MAX_RESULTS = 10
+
+# size name -> (product cards, approximate bytes of page chrome)
+SIZES = {
+    "small": (12, 0),
+    "medium": (40, 200_000),
+    "large": (60, 1_500_000),
+}
+
+BRANDS = ["Amul", "Mother Dairy", "Nestle", "Britannia", "Tata", "Fortune", "Aashirvaad", "Saffola"]
+ITEMS = ["Gold Milk", "Taaza Milk", "Butter", "Ghee", "Paneer", "Atta", "Salt", "Sunflower Oil", "Cheese Slices"]
+PACKS = ["200g", "500g", "1kg", "500ml", "1L", "5kg", "pack of 2"]
+
+PLATFORM_INFO = {
+    "flipkart": ("Flipkart", 30, "https://www.flipkart.com"),
+    "amazon": ("Amazon", 35, "https://www.amazon.in"),
+    "meesho": ("Meesho", 40, "https://www.meesho.com"),
+}
+
+def _products(rng: random.Random, count: int) -> List[Dict]:
+    products = []
+    for idx in range(count):
+        name = f"{rng.choice(BRANDS)} {rng.choice(ITEMS)} {rng.choice(PACKS)}"
+        products.append({
+            "name": name,
+            "price": rng.randint(20, 2500),
+            "slug": f"item-{idx}-{rng.randint(1000, 9999)}",
+            "image": f"https://img.example.com/{idx}.jpg",
+        })
+    return products
+
+def _chrome(rng: random.Random, size: int) -> Tuple[str, str]:
+    """Navigation, filters, scripts and footer that surround the result grid"""
+    if not size:
+        return "", ""
+    head_parts, tail_parts = [], []
+    nav = "".join(f'<li class="nav-item"><a href="/c/{i}">Category {i}</a></li>' for i in range(60))
+    head_parts.append(f'<header><nav><ul class="nav">{nav}</ul></nav></header>')
+    filters = "".join(
+        f'<div class="filter-row"><input type="checkbox" id="f{i}"><label for="f{i}">Filter {i}</label></div>'
+        for i in range(200)
+    )
+    head_parts.append(f'<aside class="filters">{filters}</aside>')
+    used = sum(len(part) for part in head_parts)
+    state = json.dumps({"items": [{"id": i, "token": rng.getrandbits(64)} for i in range(200)]})
+    while used < size:
+        block = f'<script type="application/json">{state}</script><div class="footer-links">{nav}</div>'
+        tail_parts.append(block)
+        used += len(block)
+    return "".join(head_parts), "".join(tail_parts)
+
+def _flipkart_card(variant: str, product: Dict) -> str:
+    price = f"₹{product['price']:,}"
+    if variant == "grid":
+        return (
+            f'<div class="_1AtVbE _4ddWXP"><a class="s1Q9rs" title="{product["name"]}" href="/p/{product["slug"]}">'
+            f'<img class="_396cs4" src="{product["image"]}"></a><div class="_30jeq3">{price}</div></div>'
+        )
+    if variant == "list":
+        return (
+            f'<div class="_13oc-S"><div data-id="{product["slug"]}"><a class="_1fQZEK" href="/p/{product["slug"]}">'
+            f'<img src="{product["image"]}"><div class="_4rR01T">{product["name"]}</div></a>'
+            f'<div class="_30jeq3 _1_WHN1">{price}</div></div></div>'
+        )
+    return (
+        f'<div data-id="{product["slug"]}"><a href="/p/{product["slug"]}">{product["name"]}</a>'
+        f'<img src="{product["image"]}"><span>{price}</span></div>'
+    )
+
+def _amazon_card(variant: str, product: Dict) -> str:
+    price = f"₹{product['price']:,}.00"
+    inner = (
+        f'<img class="s-image" src="{product["image"]}"><h2><a class="a-link-normal s-link-style" href="/dp/{product["slug"]}">'
+        f'<span class="a-size-base-plus a-color-base a-text-normal">{product["name"]}</span></a></h2>'
+        f'<span class="a-price"><span class="a-offscreen">{price}</span></span>'
+    )
+    if variant == "search-result":
+        return f'<div class="s-result-item s-asin" data-component-type="s-search-result" data-asin="{product["slug"]}">{inner}</div>'
+    return f'<div class="s-asin" data-asin="{product["slug"]}">{inner}</div>'
+
+def _meesho_card(variant: str, product: Dict) -> str:
+    price = f"₹{product['price']}"
+    if variant == "testid":
+        return (
+            f'<div data-testid="product-container"><a data-testid="product-link" href="/p/{product["slug"]}">'
+            f'<img data-testid="product-image" src="{product["image"]}"><p data-testid="product-name">{product["name"]}</p>'
+            f'<h5 data-testid="product-price">{price}</h5></a></div>'
+        )
+    if variant == "newcard":
+        return (
+            f'<div class="NewProductCard__Base"><a class="NewProductCard__Anchor" href="/p/{product["slug"]}">'
+            f'<img class="NewProductCard__Image" src="{product["image"]}">'
+            f'<p class="NewProductCard__ProductTitle_Desktop">{product["name"]}</p>'
+            f'<h4 class="NewProductCard__DiscountedPriceText">{price}</h4></a></div>'
+        )
+    return (
+        f'<div class="ShopCard__StyledCard"><a class="ShopCard__StyledAnchor" href="/p/{product["slug"]}">'
+        f'<img class="ShopCard__Image" src="{product["image"]}"><p class="ShopCard__ProductName">{product["name"]}</p>'
+        f'<p class="ShopCard__PriceParagraph">{price}</p></a></div>'
+    )
+
+# platform -> (card renderer, layout variants, product URL prefix)
+LAYOUTS = {
+    "flipkart": (_flipkart_card, ["grid", "list", "fallback"], "/p/"),
+    "amazon": (_amazon_card, ["search-result", "asin"], "/dp/"),
+    "meesho": (_meesho_card, ["testid", "newcard", "shopcard"], "/p/"),
+}
+
+def expected_products(platform: str, products: List[Dict]) -> List[Dict]:
+    """The product dicts a scraper should return for generated cards"""
+    display, delivery, base_url = PLATFORM_INFO[platform]
+    prefix = LAYOUTS[platform][2]
+    return [
+        {
+            "product": product["name"],
+            "price": float(product["price"]),
+            "platform": display,
+            "delivery": delivery,
+            "url": f"{base_url}{prefix}{product['slug']}",
+            "image_url": product["image"],
+        }
+        for product in products[:MAX_RESULTS]
+    ]
+
+def generate_page(platform: str, variant: str, size: str, seed: int = 0) -> Tuple[str, List[Dict]]:
+    """Build one search page and the products expected from it"""
+    rng = random.Random(f"{platform}:{variant}:{size}:{seed}")
+    cards, chrome_bytes = SIZES[size]
+    products = _products(rng, cards)
+    render, _, _ = LAYOUTS[platform]
+    head, tail = _chrome(rng, chrome_bytes)
+    grid = "".join(render(variant, product) for product in products)
+    html = (
+        f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{platform} search</title></head>'
+        f'<body>{head}<main><div class="results">{grid}</div></main>{tail}</body></html>'
+    )
+    return html, expected_products(platform, products)
+
+def generate_corpus(directory: Path = GENERATED_DIR) -> List[Path]:
+    """Write every platform/layout/size combination to disk"""
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for platform, (_, variants, _) in LAYOUTS.items():
+        for variant in variants:
+            for size in SIZES:
+                html, expected = generate_page(platform, variant, size)
+                path = directory / f"{platform}__{variant}-{size}.html"
+                path.write_text(html, encoding="utf-8")
+                path.with_suffix(".expected.json").write_text(json.dumps(expected, indent=2, ensure_ascii=False), encoding="utf-8")
+                paths.append(path)
+    return paths
+
+def load_corpus() -> List[Dict]:
+    """Load generated and recorded fixtures, generating the corpus if missing"""
+    if not GENERATED_DIR.exists() or not any(GENERATED_DIR.glob("*.html")):
+        generate_corpus()
+    fixtures = []
+    for directory in (GENERATED_DIR, RECORDED_DIR):
+        if not directory.exists():
+            continue
+        for path in sorted(directory.glob("*.html")):
+            platform = path.stem.partition("__")[0]
+            if platform not in PLATFORM_INFO:
+                continue
+            expected_path = path.with_suffix(".expected.json")
+            fixtures.append({
+                "platform": platform,
+                "name": f"{directory.name}/{path.stem}",
+                "html": path.read_text(encoding="utf-8"),
+                "expected": json.loads(expected_path.read_text(encoding="utf-8")) if expected_path.exists() else None,
+            })
+    return fixtures
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the search page fixture corpus")
+    parser.add_argument("--out", type=Path, default=GENERATED_DIR)
+    args = parser.parse_args()
+    for written in generate_corpus(args.out):
+        print(f"{written} ({written.stat().st_size // 1024} KB)")
@@ -120,6 +120,9 @@ def add_to_cart_callback(item):
 # Backend URL
 BACKEND_URL = "http://localhost:8000"
 
+# Cart items loaded per visit to the cart page
+CART_PAGE_SIZE = 100
+
 def is_token_valid():
     return st.session_state.access_token is not None
 
@@ -240,6 +243,23 @@ elif page == "Search":
                 except Exception as e:
                     st.error(f"Error during voice search: {str(e)}")
     
+    # Offer completions for what has been typed so far
+    if user_input and user_input != st.session_state.search_input:
+        try:
+            response = requests.get(f"{BACKEND_URL}/suggest", params={"q": user_input, "limit": 5}, timeout=1)
+            suggestions = response.json().get("suggestions", []) if response.status_code == 200 else []
+        except Exception as e:
+            logger.warning(f"Suggestions unavailable: {str(e)}")
+            suggestions = []
+        suggestions = [text for text in suggestions if text != user_input.lower().strip()]
+        if suggestions:
+            suggestion_cols = st.columns(len(suggestions))
+            for col, text in zip(suggestion_cols, suggestions):
+                with col:
+                    if st.button(text, key=f"suggest_{text}"):
+                        st.session_state.search_input = text
+                        st.rerun()
+    
     if st.button("Find Best Deal") or st.session_state.search_input:
         logger.info("Search initiated")
         search_query = user_input or st.session_state.search_input
@@ -251,10 +271,23 @@ elif page == "Search":
                     
                     if result.get("results"):
                         st.success("Here's what we found!")
+                        if result.get("partial"):
+                            missing = [
+                                platform for platform, info in result.get("platforms", {}).items()
+                                if info.get("status") != "ok"
+                            ]
+                            st.warning(f"⚠️ Some platforms didn't respond in time: {', '.join(missing)}")
+                        
+                        # Cheapest offer of each product sold on more than one platform
+                        best_offers = {
+                            group["offers"][0].get("url")
+                            for group in result.get("groups", [])
+                            if len(group["platforms"]) > 1
+                        }
                         
                         # Display each result
                         for idx, item in enumerate(result["results"]):
-                            is_cheapest = item['price'] == min(i['price'] for i in result["results"])
+                            is_cheapest = item.get('url') in best_offers
                             
                             # Create a container for each item
                             with st.container():
@@ -314,18 +347,26 @@ elif page == "Cart":
     
     try:
         # Get cart items
-        response = requests.get(f"{BACKEND_URL}/get_cart?username={st.session_state.username}")
+        response = requests.get(
+            f"{BACKEND_URL}/get_cart",
+            params={"username": st.session_state.username, "limit": CART_PAGE_SIZE}
+        )
         
         if response.status_code == 200:
-            cart_items = response.json()
+            cart = response.json()
+            cart_items = cart["items"]
             
-            if not cart_items:
+            if not cart["total_items"]:
                 st.info("Your cart is empty. Add some items from the Search page!")
             else:
-                total = sum(item["price"] for item in cart_items)
-                
-                st.write(f"Total Items: {len(cart_items)}")
-                st.write(f"Total Value: ₹{total:.2f}")
+                # Totals are computed by the backend over the whole cart
+                st.write(f"Total Items: {cart['total_items']}")
+                st.write(f"Total Value: ₹{cart['total_price']:.2f}")
+                st.write(f"Slowest Delivery: {cart['max_delivery']} mins")
+                for platform, summary in cart["platforms"].items():
+                    st.caption(f"{platform}: {summary['items']} item(s), ₹{summary['total_price']:.2f}")
+                if len(cart_items) < cart["total_items"]:
+                    st.caption(f"Showing the first {len(cart_items)} items")
                 
                 for idx, item in enumerate(cart_items):
                     with st.container():
@@ -339,6 +380,8 @@ elif page == "Cart":
                         
                         with col2:
                             st.markdown(f"**₹{item['price']}**")
+                            if item.get("price_changed") and item.get("previous_price") is not None:
+                                st.caption(f"was ₹{item['previous_price']}")
                         
                         with col3:
                             st.markdown(f"⏱️ {item['delivery']} mins")
@@ -0,0 +1,51 @@
+# tests/test_catalog.py
+
+import asyncio
+import catalog
+
+class SlowProducts:
+    """products collection whose bulk writes take a moment"""
+
+    def __init__(self):
+        self.written = []
+
+    async def bulk_write(self, operations, ordered=True):
+        await asyncio.sleep(0.01)
+        self.written.extend(operations)
+
+class FakeDatabase:
+    def __init__(self):
+        self.products = SlowProducts()
+
+def product(idx: int) -> dict:
+    return {
+        "product": f"Milk {idx}",
+        "price": 30.0,
+        "platform": "Flipkart",
+        "delivery": 30,
+        "url": f"https://www.flipkart.com/p/{idx}",
+        "image_url": None,
+    }
+
+def test_close_waits_for_early_flushes_and_writes_the_rest(monkeypatch):
+    database = FakeDatabase()
+
+    async def get_database():
+        return database
+
+    monkeypatch.setattr(catalog, "get_database", get_database)
+
+    async def run():
+        products = catalog.ProductCatalog()
+        products.record("flipkart", [product(idx) for idx in range(catalog.CATALOG_BATCH_SIZE)])
+        assert len(products._flush_tasks) == 1
+        # Arrives while the early flush is still writing
+        await asyncio.sleep(0)
+        products.record("flipkart", [product(catalog.CATALOG_BATCH_SIZE)])
+        await products.close()
+        return products
+
+    products = asyncio.run(run())
+    assert not products._flush_tasks
+    assert products.written == catalog.CATALOG_BATCH_SIZE + 1
+    assert len(database.products.written) == catalog.CATALOG_BATCH_SIZE + 1
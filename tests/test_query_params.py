@@ -0,0 +1,89 @@
+# tests/test_query_params.py
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+import queryhandler
+
+app = FastAPI()
+app.include_router(queryhandler.router)
+client = TestClient(app)
+
+@pytest.mark.parametrize("budget", ["soon", None, [1], "nan", "inf", True, False])
+def test_get_budget_rejects_non_numeric(budget):
+    with pytest.raises(HTTPException) as raised:
+        queryhandler.get_budget({"query": "milk", "budget": budget})
+    assert raised.value.status_code == 400
+
+def test_get_budget_clamps_numbers():
+    assert queryhandler.get_budget({}) == queryhandler.DEFAULT_LATENCY_BUDGET
+    assert queryhandler.get_budget({"budget": "0"}) == 0.1
+    assert queryhandler.get_budget({"budget": 1000}) == queryhandler.MAX_LATENCY_BUDGET
+
+@pytest.mark.parametrize("path", ["/query", "/query/stream"])
+@pytest.mark.parametrize("body", [{"query": "milk", "budget": "soon"}, {"budget": 1}])
+def test_bad_input_is_a_400_on_both_endpoints(path, body):
+    response = client.post(path, json=body)
+    assert response.status_code == 400
+
+@pytest.mark.parametrize("field", ["limit", "offset", "per_platform_cap"])
+@pytest.mark.parametrize("value", [True, False, "ten", None, float("inf"), [5]])
+def test_get_page_rejects_non_integers(field, value):
+    with pytest.raises(HTTPException) as raised:
+        queryhandler.get_page({"query": "milk", field: value})
+    assert raised.value.status_code == 400
+
+def test_get_page_reads_integers():
+    page = queryhandler.get_page({"query": "milk", "limit": 5, "offset": "10", "per_platform_cap": 20})
+    assert (page["limit"], page["offset"], page["per_platform_cap"]) == (5, 10, 20)
+
+@pytest.mark.parametrize("path", ["/query", "/query/stream"])
+def test_boolean_limit_is_a_400(path):
+    response = client.post(path, json={"query": "milk", "limit": True})
+    assert response.status_code == 400
+
+@pytest.mark.parametrize("weights", [
+    {"price": float("inf")},
+    {"price": float("nan")},
+    {"delivery": "2"},
+    {"delivery": "inf"},
+    {"unit_price": True},
+    {"price": None},
+    {"price": -1},
+    {"price": 0, "unit_price": 0, "delivery": 0},
+])
+def test_get_page_rejects_bad_weights(weights):
+    with pytest.raises(HTTPException) as raised:
+        queryhandler.get_page({"query": "milk", "weights": weights})
+    assert raised.value.status_code == 400
+
+def test_get_page_fills_unset_weights():
+    page = queryhandler.get_page({"query": "milk", "weights": {"price": 2}})
+    assert page["weights"] == {"price": 2.0, "unit_price": 1.0, "delivery": 0.5}
+
+@pytest.mark.parametrize("path", ["/query", "/query/stream"])
+def test_non_finite_weights_are_a_400(path):
+    response = client.post(path, json={"query": "milk", "weights": {"price": "nan"}})
+    assert response.status_code == 400
+
+@pytest.mark.parametrize("platforms", ["amazon", {"amazon": True}, ["amazon", 1], [["amazon"]]])
+def test_get_platforms_requires_a_list_of_names(platforms):
+    with pytest.raises(HTTPException) as raised:
+        queryhandler.get_platforms({"query": "milk", "platforms": platforms})
+    assert raised.value.status_code == 400
+    assert "must be a list" in raised.value.detail
+
+def test_get_platforms_reports_unknown_names():
+    with pytest.raises(HTTPException) as raised:
+        queryhandler.get_platforms({"query": "milk", "platforms": ["amazon", "nowhere"]})
+    assert raised.value.status_code == 400
+    assert raised.value.detail == "Unknown platforms: nowhere"
+
+def test_get_platforms_defaults_to_all():
+    assert queryhandler.get_platforms({"query": "milk"}) == tuple(sorted(queryhandler.PLATFORMS))
+    assert queryhandler.get_platforms({"platforms": ["flipkart", "amazon", "amazon"]}) == ("amazon", "flipkart")
+
+@pytest.mark.parametrize("path", ["/query", "/query/stream"])
+def test_platform_string_is_a_400(path):
+    response = client.post(path, json={"query": "milk", "platforms": "Amazon"})
+    assert response.status_code == 400
@@ -0,0 +1,52 @@
+# tests/test_search_platform.py
+
+import asyncio
+import copy
+from aiohttp import web
+import http_client
+import queryhandler
+import rate_limit
+from registry import PLATFORMS
+
+async def search_rate_limited_server(retry_after: str):
+    """Run search_platform against a local server that always answers 429"""
+    hits = []
+
+    async def handler(request):
+        hits.append(request.path)
+        return web.Response(status=429, headers={"Retry-After": retry_after})
+
+    app = web.Application()
+    app.router.add_get("/search", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    adapter = copy.copy(PLATFORMS["flipkart"])
+    adapter.get_search_url = lambda query: f"http://127.0.0.1:{port}/search"
+    try:
+        status, results = await queryhandler.search_platform(adapter, "milk", {"User-Agent": "test"})
+    finally:
+        await http_client.close_http_sessions()
+        await runner.cleanup()
+    return status, results, hits
+
+def reset_platform_limits():
+    rate_limit.rate_limiters.clear()
+    rate_limit.circuit_breakers.clear()
+
+def test_429_is_retried_then_reported_as_rate_limited():
+    reset_platform_limits()
+    status, results, hits = asyncio.run(search_rate_limited_server("0"))
+    assert status == queryhandler.STATUS_RATE_LIMITED
+    assert results == []
+    assert len(hits) == rate_limit.MAX_RETRIES + 1
+
+def test_429_with_long_retry_after_is_not_retried():
+    reset_platform_limits()
+    retry_after = str(int(rate_limit.MAX_RETRY_AFTER) + 60)
+    status, _, hits = asyncio.run(search_rate_limited_server(retry_after))
+    assert status == queryhandler.STATUS_RATE_LIMITED
+    assert len(hits) == 1
@@ -0,0 +1,44 @@
+# tests/test_search_with_budget.py
+
+import asyncio
+import time
+import pytest
+import queryhandler
+
+def run_hedged(monkeypatch, primary, hedge, budget: float):
+    """search_with_budget with a hedge sent at once; primary and hedge are (delay, status)"""
+    calls = []
+
+    async def search_platform(adapter, query_text, headers, max_results):
+        delay, status = primary if not calls else hedge
+        calls.append(status)
+        await asyncio.sleep(delay)
+        if status == "raise":
+            raise RuntimeError("parse failed")
+        return status, [{"product": "Milk"}] if status == queryhandler.STATUS_OK else []
+
+    monkeypatch.setattr(queryhandler, "search_platform", search_platform)
+    monkeypatch.setattr(queryhandler.platform_latency, "percentile", lambda platform, pct: 0.01)
+    monkeypatch.setattr(queryhandler.platform_latency, "record", lambda platform, elapsed: None)
+
+    async def run():
+        deadline = time.monotonic() + budget
+        return await queryhandler.search_with_budget("amazon", "milk", {}, deadline)
+
+    return asyncio.run(run())
+
+@pytest.mark.parametrize("hedge_status", [queryhandler.STATUS_HTTP_ERROR, "raise"])
+def test_failed_hedge_waits_for_the_primary_until_the_deadline(monkeypatch, hedge_status):
+    outcome = run_hedged(monkeypatch, (5.0, queryhandler.STATUS_OK), (0.02, hedge_status), budget=0.2)
+    assert outcome["hedged"]
+    assert outcome["status"] == queryhandler.STATUS_BUDGET_EXCEEDED
+    assert 150 <= outcome["elapsed_ms"] < 1000
+
+def test_failed_hedge_still_uses_a_late_primary(monkeypatch):
+    outcome = run_hedged(monkeypatch, (0.15, queryhandler.STATUS_OK), (0.02, queryhandler.STATUS_HTTP_ERROR), budget=1.0)
+    assert outcome["status"] == queryhandler.STATUS_OK
+    assert outcome["results"]
+
+def test_primary_failure_is_reported_when_both_fail(monkeypatch):
+    outcome = run_hedged(monkeypatch, (0.1, queryhandler.STATUS_BLOCKED), (0.02, queryhandler.STATUS_HTTP_ERROR), budget=1.0)
+    assert outcome["status"] == queryhandler.STATUS_BLOCKED
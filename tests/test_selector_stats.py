@@ -0,0 +1,54 @@
+# tests/test_selector_stats.py
+
+import selector_stats
+from registry import PLATFORMS
+from selector_stats import SELECTOR_HALF_LIFE, SelectorStats
+
+PRIMARY = 'div.s-result-item[data-component-type="s-search-result"]'
+FALLBACK = "div.s-asin"
+
+def container_order(stats: SelectorStats):
+    adapter = PLATFORMS["amazon"]
+    scraper = adapter.create_scraper(selector_order=stats.preferred_order("amazon", adapter.selectors))
+    return scraper.ordered("container")
+
+def primary_misses(stats: SelectorStats, parses: int = 1):
+    """Parses where the primary container selector missed and the broad fallback hit"""
+    declared = PLATFORMS["amazon"].selectors["container"]
+    for _ in range(parses):
+        stats.record(
+            "amazon",
+            {"container": {FALLBACK: 1}},
+            {"container": {selector: 1 for selector in declared if selector != FALLBACK}},
+        )
+
+def test_declared_order_without_stats():
+    assert container_order(SelectorStats()) == PLATFORMS["amazon"].selectors["container"]
+
+def test_one_off_fallback_hit_keeps_the_primary_first():
+    stats = SelectorStats()
+    primary_misses(stats)
+    assert container_order(stats)[0] == PRIMARY
+
+    for _ in range(20):
+        stats.record("amazon", {"container": {PRIMARY: 1}})
+    primary_misses(stats)
+    assert container_order(stats)[0] == PRIMARY
+
+def test_selectors_that_keep_missing_are_tried_last():
+    stats = SelectorStats()
+    primary_misses(stats, parses=10)
+    order = container_order(stats)
+    assert order[0] == FALLBACK
+    # The demoted selectors keep their declared order behind it
+    assert order[1:] == [selector for selector in PLATFORMS["amazon"].selectors["container"] if selector != FALLBACK]
+
+def test_demoted_selectors_are_retried_once_their_misses_decay(monkeypatch):
+    stats = SelectorStats()
+    now = 1_000_000.0
+    monkeypatch.setattr(selector_stats.time, "time", lambda: now)
+    primary_misses(stats, parses=10)
+    assert container_order(stats)[0] == FALLBACK
+
+    now += 2 * SELECTOR_HALF_LIFE
+    assert container_order(stats)[0] == PRIMARY
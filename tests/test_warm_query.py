@@ -0,0 +1,24 @@
+# tests/test_warm_query.py
+
+import asyncio
+import pytest
+import queryhandler
+
+@pytest.mark.parametrize("cached_cap", [3, 40])
+def test_warm_query_keeps_the_cached_per_platform_cap(monkeypatch, cached_cap):
+    key = ("milk", ("amazon",))
+    caps = []
+
+    async def run_search(query_text, platforms, budget, per_platform_cap=queryhandler.DEFAULT_MAX_RESULTS):
+        caps.append(per_platform_cap)
+        return {"total": 0, "partial": False, "per_platform_cap": per_platform_cap, "platforms": {}}
+
+    monkeypatch.setattr(queryhandler, "run_search", run_search)
+    queryhandler.query_cache.set(key, {"total": 0, "partial": False, "per_platform_cap": cached_cap, "platforms": {}})
+    try:
+        asyncio.run(queryhandler.warm_query(key, "milk", ("amazon",)))
+        assert caps == [cached_cap]
+        cached, _ = queryhandler.query_cache.get(key)
+        assert cached["per_platform_cap"] == cached_cap
+    finally:
+        queryhandler.query_cache.invalidate(key)